@@ -0,0 +1,280 @@
+# file: api_server.py
+"""
+Headless HTTP API for machine clients (ATS integrations, job boards):
+
+    POST /v1/extract     raw PDF body                                   -> {"text"}
+    POST /v1/ats-score   {"resume_text", "job_description"}             -> score result
+                         {"resume_text", "job_descriptions": [...]}     -> {"rankings": [...]}
+    POST /v1/feedback    {"resume_text"}                                -> {"score", "feedback"}
+    POST /v1/render      resume JSON (same fields as the builder form)  -> application/pdf
+    GET  /health, GET /metrics
+
+    python api_server.py --port 8080
+
+Rendering and PDF extraction (pure-Python, CPU-bound) run on a process
+pool; scoring and Gemini feedback run on a thread pool that shares the
+loaded models and caches. Each pool admits at most workers + queue depth
+requests; beyond that the API answers 429, and a request that does not
+finish within RESUME_FORGE_API_TIMEOUT seconds gets 504. Malformed input
+(including an unreadable PDF) gets 400; scoring without the local models
+or feedback without Gemini configured gets 503, and a failed Gemini call
+gets 502, never a placeholder score of 0.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common import metrics
+
+API_WORKERS = int(os.environ.get("RESUME_FORGE_API_WORKERS", "4"))
+API_CPU_WORKERS = int(os.environ.get("RESUME_FORGE_API_CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+API_QUEUE_DEPTH = int(os.environ.get("RESUME_FORGE_API_QUEUE", "16"))
+REQUEST_TIMEOUT_SECONDS = float(os.environ.get("RESUME_FORGE_API_TIMEOUT", "30"))
+
+# JSON bodies; PDF uploads are bounded by resume_parser.MAX_PDF_BYTES instead
+MAX_JSON_BYTES = 2 * 1024 * 1024
+
+class PoolSaturatedError(Exception):
+    """Raised when a pool already has workers + queue depth requests admitted."""
+
+class BoundedPool:
+    """An executor that refuses work instead of queueing without limit."""
+    def __init__(self, executor, capacity: int):
+        self.executor = executor
+        self._slots = threading.BoundedSemaphore(capacity)
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PoolSaturatedError()
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+# --- Work (CPU pool functions run in spawned processes, so they must be module-level) ---
+def _init_cpu_worker():
+    from builder.pdf_generator import ResumePDF
+    from reviewer import resume_parser
+    # Each worker handles whole documents; don't fan pages out to another pool
+    resume_parser.PARALLEL_PAGE_THRESHOLD = sys.maxsize
+    # Parse the fonts once per worker so every render reuses the cached templates
+    ResumePDF('P', 'mm', 'A4')
+
+def _render(resume) -> bytes:
+    from builder.pdf_generator import generate_pdf
+    return bytes(generate_pdf(resume))
+
+def _extract(data: bytes) -> str:
+    from reviewer.resume_parser import extract_text_from_pdf
+    return extract_text_from_pdf(data)
+
+def _score(resume_text: str, job_description: str = None, job_descriptions: list = None) -> dict:
+    from reviewer.ats_scoring import SKILL_ENGINE, calculate_ats_score, rank_job_descriptions
+    from reviewer.models import get_keybert_model, get_sbert_model
+    # Without the models every score would be a placeholder 0; say so instead of returning one
+    if get_sbert_model() is None:
+        raise ApiError(503, "the sentence model is not loaded")
+    if SKILL_ENGINE != "taxonomy" and get_keybert_model() is None:
+        raise ApiError(503, "the KeyBERT model is not loaded")
+    if job_descriptions is not None:
+        return {"rankings": rank_job_descriptions(resume_text, job_descriptions)}
+    return calculate_ats_score(resume_text, job_description)
+
+def _feedback(resume_text: str) -> dict:
+    from reviewer.ai_suggestions import SuggestionsUnavailableError, fetch_general_ai_feedback
+    try:
+        return fetch_general_ai_feedback(resume_text)
+    except SuggestionsUnavailableError as e:
+        # 503 when Gemini is not configured, 502 when the Gemini call itself failed
+        raise ApiError(503 if e.__cause__ is None else 502, str(e))
+
+def _resume_data(body: dict):
+    """Validates a render request's shape up front, so malformed records never reach the CPU pool."""
+    from builder.resume_data import ResumeData
+    for field in ("work_experience", "education", "projects", "certifications"):
+        entries = body.get(field)
+        if entries is not None and (not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries)):
+            raise ApiError(400, f"\"{field}\" must be a list of objects")
+    return ResumeData.from_dict(body)
+
+def _require_text(body: dict, field: str) -> str:
+    value = body.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ApiError(400, f"\"{field}\" must be a non-empty string")
+    return value
+
+def make_handler(cpu_pool: BoundedPool, model_pool: BoundedPool, timeout: float):
+    from PyPDF2.errors import PyPdfError
+    from reviewer.resume_parser import MAX_PDF_BYTES, PDFTooLargeError
+
+    class ApiHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, body: bytes, content_type: str, headers: dict = None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if self.close_connection:
+                self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: int, body: dict, headers: dict = None):
+            self._send(status, json.dumps(body).encode("utf-8"), "application/json", headers)
+
+        def _read_body(self, limit: int) -> bytes:
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                # The body's end is unknown, so the connection can't be reused
+                self.close_connection = True
+                raise ApiError(400, "Content-Length must be a non-negative integer")
+            if length > limit:
+                # Refuse without reading the body; closing the connection discards it
+                self.close_connection = True
+                raise ApiError(413, f"request body is larger than {limit} bytes")
+            return self.rfile.read(length)
+
+        def _read_json(self) -> dict:
+            try:
+                body = json.loads(self._read_body(MAX_JSON_BYTES) or b"{}")
+            except ValueError as e:
+                raise ApiError(400, f"invalid JSON: {e}")
+            if not isinstance(body, dict):
+                raise ApiError(400, "request body must be a JSON object")
+            return body
+
+        def _run(self, pool: BoundedPool, fn, *args):
+            try:
+                future = pool.submit(fn, *args)
+            except PoolSaturatedError:
+                metrics.incr("api_rejected_total", reason="saturated")
+                raise ApiError(429, "server is busy, retry later")
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                # Drops the request if it is still queued; a running one finishes in the background
+                future.cancel()
+                metrics.incr("api_rejected_total", reason="timeout")
+                raise ApiError(504, f"request did not finish within {timeout:g} seconds")
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/metrics":
+                self._send(200, metrics.REGISTRY.render_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            routes = {
+                "/v1/extract": self._extract,
+                "/v1/ats-score": self._ats_score,
+                "/v1/feedback": self._feedback,
+                "/v1/render": self._render,
+            }
+            route = routes.get(self.path)
+            if route is None:
+                # The body was not read, so it would be parsed as the next request on this connection
+                self.close_connection = True
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                with metrics.span(f"api{self.path.replace('/', '_').replace('-', '_')}"):
+                    route()
+            except ApiError as e:
+                headers = {"Retry-After": "1"} if e.status == 429 else None
+                self._send_json(e.status, {"error": str(e)}, headers)
+            except PDFTooLargeError as e:
+                self._send_json(413, {"error": str(e)})
+            except (ValueError, TypeError, KeyError) as e:
+                self._send_json(400, {"error": f"invalid request: {e}"})
+            except Exception as e:
+                self._send_json(500, {"error": f"internal error: {e}"})
+
+        def _extract(self):
+            data = self._read_body(MAX_PDF_BYTES)
+            if not data:
+                raise ApiError(400, "request body must be the PDF file")
+            try:
+                text = self._run(cpu_pool, _extract, data)
+            except PyPdfError as e:
+                raise ApiError(400, f"invalid PDF: {e}")
+            self._send_json(200, {"text": text})
+
+        def _ats_score(self):
+            body = self._read_json()
+            resume_text = _require_text(body, "resume_text")
+            job_descriptions = body.get("job_descriptions")
+            if job_descriptions is not None:
+                if not isinstance(job_descriptions, list) or not all(isinstance(jd, str) for jd in job_descriptions):
+                    raise ApiError(400, "\"job_descriptions\" must be a list of strings")
+                result = self._run(model_pool, _score, resume_text, None, job_descriptions)
+            else:
+                result = self._run(model_pool, _score, resume_text, _require_text(body, "job_description"))
+            self._send_json(200, result)
+
+        def _feedback(self):
+            body = self._read_json()
+            self._send_json(200, self._run(model_pool, _feedback, _require_text(body, "resume_text")))
+
+        def _render(self):
+            pdf_bytes = self._run(cpu_pool, _render, _resume_data(self._read_json()))
+            self._send(200, pdf_bytes, "application/pdf")
+
+        def log_message(self, format, *args):
+            pass
+
+    return ApiHandler
+
+def serve(host: str, port: int, workers: int, cpu_workers: int, queue_depth: int, timeout: float):
+    cpu_executor = ProcessPoolExecutor(
+        max_workers=cpu_workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_cpu_worker
+    )
+    model_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+    cpu_pool = BoundedPool(cpu_executor, cpu_workers + queue_depth)
+    model_pool = BoundedPool(model_executor, workers + queue_depth)
+
+    server = ThreadingHTTPServer((host, port), make_handler(cpu_pool, model_pool, timeout))
+    server.daemon_threads = True
+    print(f"Resume Forge API listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        cpu_executor.shutdown(cancel_futures=True)
+        model_executor.shutdown(cancel_futures=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless HTTP API for scoring, extraction, feedback and rendering.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="Threads for scoring and Gemini feedback.")
+    parser.add_argument("--cpu-workers", type=int, default=API_CPU_WORKERS, help="Processes for rendering and PDF extraction.")
+    parser.add_argument("--queue", type=int, default=API_QUEUE_DEPTH, help="Requests queued per pool before answering 429.")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT_SECONDS, help="Seconds before a request gets 504.")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.workers, args.cpu_workers, args.queue, args.timeout)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,14 +1,22 @@
 # file: app.py
 
+import hashlib
+
 import streamlit as st
 import plotly.graph_objects as go
 from streamlit_option_menu import option_menu
 
 # Import your custom modules
 from builder.form_handler import handle_resume_form
-from reviewer.resume_parser import extract_text_from_pdf
+from reviewer.resume_parser import PDFTooLargeError, extract_text_from_pdf
+from reviewer.pipeline import start_analysis, suggestions_key
+from reviewer.ats_scoring import rank_job_descriptions, split_job_descriptions
 from reviewer.ats_scoring import calculate_ats_score
-from reviewer.ai_suggestions import get_ai_suggestions
+from reviewer.ai_suggestions import stream_ai_suggestions
+from reviewer.models import WARMUP_ENABLED, get_sbert_model, start_background_warmup
+from reviewer.response_cache import RESPONSE_CACHE
+from common import metrics
+from common.session_store import SESSION_STORE, content_key
 
 # --- Core Layout and Page Configuration ---
 st.set_page_config(
@@ -28,15 +36,70 @@ def load_custom_css():
 
 load_custom_css()
 
+# Models load lazily on first use; optionally start loading them now in the background
+if WARMUP_ENABLED:
+    start_background_warmup()
+
+# Exposes stage timings, counters and cache stats if RESUME_FORGE_METRICS_PORT / _JSON are set
+metrics.start_exporters()
+
 # --- Session State Initialization ---
-if 'resume_text' not in st.session_state:
-    st.session_state.resume_text = None
+# Heavy artifacts (resume text, analysis results) live in the shared, size-bounded
+# SESSION_STORE; the session only keeps their keys.
+if 'resume_key' not in st.session_state:
+    st.session_state.resume_key = None
+if 'resume_name' not in st.session_state:
+    st.session_state.resume_name = None
+if 'uploader_generation' not in st.session_state:
+    st.session_state.uploader_generation = 0
 if 'job_description' not in st.session_state:
     st.session_state.job_description = ""
 if 'analysis_done' not in st.session_state:
     st.session_state.analysis_done = False
-if 'analysis_results' not in st.session_state:
-    st.session_state.analysis_results = {}
+if 'analysis_key' not in st.session_state:
+    st.session_state.analysis_key = None
+if 'analysis_mode' not in st.session_state:
+    st.session_state.analysis_mode = None
+if 'job_descriptions_text' not in st.session_state:
+    st.session_state.job_descriptions_text = ""
+
+def analysis_inputs(mode: str):
+    """The job text an analysis of this mode ("ats", "general" or "multi") depends on."""
+    if mode == "multi":
+        return st.session_state.job_descriptions_text
+    return st.session_state.job_description if mode == "ats" else ""
+
+def get_resume_text():
+    """The analyzed resume's text, or None if it was evicted (it needs a re-upload then)."""
+    return SESSION_STORE.get(st.session_state.resume_key)
+
+def get_analysis():
+    """
+    The current analysis (a score result, or the JD rankings in "multi" mode).
+    An evicted ATS score or ranking is recomputed locally if its inputs are
+    still at hand; an evicted general review (a billable Gemini call) reads
+    as expired, to be re-run from the Analyze button.
+    """
+    key, mode = st.session_state.analysis_key, st.session_state.analysis_mode
+
+    def recompute():
+        # Without the sentence model the scores would be placeholders; don't store those as the analysis
+        if mode not in ("ats", "multi") or get_sbert_model() is None:
+            return None
+        resume_text = get_resume_text()
+        job_text = analysis_inputs(mode)
+        if resume_text is None or content_key("analysis", mode, st.session_state.resume_key, job_text) != key:
+            return None
+        if mode == "multi":
+            return rank_job_descriptions(resume_text, split_job_descriptions(job_text))
+        return calculate_ats_score(resume_text, job_text)
+
+    return SESSION_STORE.get_or_compute(key, "analysis", recompute)
+
+def store_analysis(mode: str, results):
+    st.session_state.analysis_mode = mode
+    st.session_state.analysis_key = content_key("analysis", mode, st.session_state.resume_key, analysis_inputs(mode))
+    SESSION_STORE.put(st.session_state.analysis_key, "analysis", results)
 
 # --- Main App Structure ---
 st.title("Resume Forge")
@@ -63,20 +126,30 @@ if selected == "Build Resume":
 # --- Section 2: ATS Review ---
 # In app.py, replace the entire "ATS Review" section with this
 
-# --- NEW: Import the new function ---
-from reviewer.ai_suggestions import get_general_ai_feedback
-
 # --- Section 2: ATS Review (UPDATED) ---
 if selected == "ATS Review":
     st.header("📊 ATS & Quality Review")
     st.write("Upload your resume for an analysis. You can either check it against a specific job or get a general quality score.")
 
-    uploaded_resume = st.file_uploader("📄 Upload Your Resume (PDF)", type=["pdf"])
+    # A new key after each analysis empties the uploader, so the upload isn't held through reruns
+    uploaded_resume = st.file_uploader(
+        "📄 Upload Your Resume (PDF)", type=["pdf"], key=f"resume_upload_{st.session_state.uploader_generation}"
+    )
+    if uploaded_resume is None and st.session_state.resume_name and get_resume_text() is not None:
+        st.caption(f"Analyzed resume: {st.session_state.resume_name}. Upload another file to replace it.")
 
     # --- NEW: Checkbox to toggle review mode ---
     review_mode = st.checkbox("Review against a specific job description", value=True)
 
-    if review_mode:
+    multi_jd = review_mode and st.checkbox("Compare against several job descriptions")
+
+    if multi_jd:
+        st.session_state.job_descriptions_text = st.text_area(
+            "📝 Paste the Job Descriptions Here (separate them with a line containing ---)",
+            value=st.session_state.job_descriptions_text,
+            height=300
+        )
+    elif review_mode:
         st.session_state.job_description = st.text_area(
             "📝 Paste the Job Description Here",
             value=st.session_state.job_description,
@@ -84,38 +157,105 @@ if selected == "ATS Review":
         )
 
     if st.button("🔍 Analyze Resume", use_container_width=True):
-        if uploaded_resume:
-            with st.spinner('AI is analyzing your resume... This may take a moment. ⏳'):
-                st.session_state.resume_text = extract_text_from_pdf(uploaded_resume)
+        if uploaded_resume is None and get_resume_text() is None:
+            st.warning("⚠️ Please upload a resume to begin analysis.")
+        else:
+            with st.spinner('AI is analyzing your resume... This may take a moment. ⏳'), metrics.profile_request("analyze"):
+                if uploaded_resume is not None:
+                    try:
+                        resume_key = content_key("resume_text", hashlib.sha256(uploaded_resume.getvalue()).hexdigest())
+                        SESSION_STORE.put(resume_key, "resume_text", extract_text_from_pdf(uploaded_resume))
+                    except PDFTooLargeError as e:
+                        st.warning(f"⚠️ {e}")
+                        st.stop()
+                    st.session_state.resume_key = resume_key
+                    st.session_state.resume_name = uploaded_resume.name
+                resume_text = get_resume_text()
                 
                 # --- NEW: Logic to call the correct function ---
-                if review_mode:
-                    if st.session_state.job_description:
-                        # Call the ATS scorer for specific job review
-                        st.session_state.analysis_results = calculate_ats_score(st.session_state.resume_text, st.session_state.job_description)
-                        st.session_state.analysis_done = True
-                    else:
-                        st.warning("⚠️ Please paste a job description for an ATS review.")
-                        st.session_state.analysis_done = False
+                job_descriptions = split_job_descriptions(st.session_state.job_descriptions_text) if multi_jd else []
+                if multi_jd and not job_descriptions:
+                    st.warning("⚠️ Please paste at least one job description to compare against.")
+                    st.session_state.analysis_done = False
+                elif multi_jd:
+                    # The resume is encoded once and scored against every JD in one batch;
+                    # the Suggestions tab works from the best match
+                    rankings = rank_job_descriptions(resume_text, job_descriptions)
+                    store_analysis("multi", rankings)
+                    st.session_state.job_description = job_descriptions[rankings[0].get('jd_index', 0)] if rankings else ""
+                    st.session_state.suggestions_key = None
+                    st.session_state.analysis_done = True
+                elif review_mode and not st.session_state.job_description:
+                    st.warning("⚠️ Please paste a job description for an ATS review.")
+                    st.session_state.analysis_done = False
                 else:
-                    # Call the new general feedback function
-                    st.session_state.analysis_results = get_general_ai_feedback(st.session_state.resume_text)
+                    # Scoring (or the general review) and the Suggestions prefetch run in the background;
+                    # only the ATS Review result is waited for here
+                    results_future, st.session_state.suggestions_key = start_analysis(
+                        resume_text,
+                        st.session_state.job_description,
+                        review_mode
+                    )
+                    store_analysis("ats" if review_mode else "general", results_future.result())
                     st.session_state.analysis_done = True
 
                 if st.session_state.analysis_done:
                     st.toast('Analysis complete! 🎉', icon='✅')
-        else:
-            st.warning("⚠️ Please upload a resume to begin analysis.")
+                    if uploaded_resume is not None:
+                        # The text is stored now; the uploader comes back empty on the next
+                        # rerun, releasing the uploaded file
+                        st.session_state.uploader_generation += 1
 
     # Display results if analysis has been run
-    if st.session_state.analysis_done:
-        results = st.session_state.analysis_results
+    analysis = get_analysis() if st.session_state.analysis_done else None
+    if st.session_state.analysis_done and analysis is None:
+        st.info("Your analysis has expired. Click \"Analyze Resume\" to run it again (re-upload the resume if asked).")
+    elif analysis is not None and st.session_state.analysis_mode == "multi" and not multi_jd:
+        st.info(
+            "Your last analysis compared several job descriptions. Tick \"Compare against several job descriptions\" "
+            "to see the ranking, or click \"Analyze Resume\" to run this review instead."
+        )
+    elif analysis is not None and st.session_state.analysis_mode == "multi":
+        rankings = analysis
+        st.markdown("---")
+        st.subheader("🏆 Job Description Ranking")
+        st.dataframe(
+            [
+                {
+                    "Rank": rank,
+                    "Job": result.get('title', f"Job {rank}"),
+                    "Score": result.get('score', 0),
+                    "Matched": len(result.get('matched_skills', [])),
+                    "Missing": len(result.get('missing_skills', [])),
+                }
+                for rank, result in enumerate(rankings, start=1)
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
+        for rank, result in enumerate(rankings, start=1):
+            with st.expander(f"{rank}. {result.get('title', f'Job {rank}')} — {result.get('score', 0)}%"):
+                st.info(result.get('feedback', ''))
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("✅ **Skills Matched**")
+                    for skill in result.get('matched_skills', []):
+                        st.markdown(f"- {skill}")
+                with col2:
+                    st.markdown("❌ **Skills to Add**")
+                    for skill in result.get('missing_skills', []):
+                        st.markdown(f"- {skill}")
+        if rankings:
+            st.caption(f"Suggestions are generated for the best match: {rankings[0].get('title', 'Job 1')}")
+    elif analysis is not None and st.session_state.analysis_mode != "multi":
+        results = analysis
         score_value = results.get('score', 0)
         feedback_text = results.get('feedback', '')
         
         st.markdown("---")
-        # --- NEW: Dynamic subheader ---
-        subheader_text = "🎯 ATS Match Score" if review_mode else "📈 Resume Quality Score"
+        # Shown as the kind of analysis that was run, even if the checkboxes have changed since
+        ats_review = st.session_state.analysis_mode == "ats"
+        subheader_text = "🎯 ATS Match Score" if ats_review else "📈 Resume Quality Score"
         st.subheader(subheader_text)
         
         # (Your existing Plotly gauge chart code is perfect here)
@@ -128,14 +268,17 @@ if selected == "ATS Review":
         st.plotly_chart(fig, use_container_width=True)
         
         # --- NEW: Display feedback based on review mode ---
-        if review_mode:
+        if ats_review:
             st.info(feedback_text)
             st.markdown("### Skill Analysis")
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("✅ **Skills Matched**")
+                evidence = results.get('evidence', {})
                 for skill in results.get('matched_skills', []):
                     st.markdown(f"- {skill}")
+                    if evidence.get(skill):
+                        st.caption(f"“{evidence[skill]}”")
             with col2:
                 st.markdown("❌ **Skills to Add**")
                 for skill in results.get('missing_skills', []):
@@ -151,15 +294,27 @@ if selected == "Suggestions":
     st.header("🧠 AI-Powered Improvement Suggestions")
     st.write("Get actionable feedback from our AI career coach to improve your resume.")
 
+    analysis = get_analysis() if st.session_state.analysis_done else None
+    resume_text = get_resume_text() if st.session_state.analysis_done else None
     if not st.session_state.analysis_done:
         st.info("💡 Please upload and analyze a resume in the 'ATS Review' section first.")
+    elif analysis is None or resume_text is None:
+        st.info("💡 Your analysis has expired. Please analyze your resume again in the 'ATS Review' section.")
     else:
-        # This is where the API call happens!
-        with st.spinner('AI Coach is reviewing your resume...'):
-            missing_skills = st.session_state.analysis_results.get('missing_skills', [])
-            suggestions = get_ai_suggestions(
-                st.session_state.resume_text, 
+        # In multi-JD mode the suggestions target the best-matching JD
+        results = (analysis[0] if analysis else {}) if st.session_state.analysis_mode == "multi" else analysis
+        missing_skills = results.get('missing_skills', [])
+        prefetch_key = st.session_state.get('suggestions_key')
+        expected_key = suggestions_key(resume_text, st.session_state.job_description, missing_skills)
+        prefetched = RESPONSE_CACHE.get(prefetch_key) if prefetch_key and prefetch_key == expected_key else None
+        if prefetched is not None:
+            # Prefetched in the background right after the analysis
+            st.markdown(prefetched)
+        else:
+            # This is where the API call happens! The review is rendered as it streams in
+            # (or picked up from the still-running prefetch of the same request).
+            st.write_stream(stream_ai_suggestions(
+                resume_text,
                 st.session_state.job_description,
                 missing_skills
-            )
-            st.markdown(suggestions)
\ No newline at end of file
+            ))
\ No newline at end of file
@@ -0,0 +1,76 @@
+# file: benchmarks/bench_pdf_generation.py
+"""
+Micro-benchmark for builder.pdf_generator.generate_pdf: per-PDF latency
+with the process-level font cache disabled (fonts parsed for every PDF)
+versus enabled.
+
+    python -m benchmarks.bench_pdf_generation --runs 50
+"""
+
+import argparse
+import statistics
+import time
+
+import builder.pdf_generator as pdf_generator
+
+SAMPLE_RESUME = {
+    'full_name': 'Alex Morgan',
+    'job_title': 'Senior Data Engineer',
+    'email': 'alex.morgan@example.com',
+    'phone': '+1 555 0100',
+    'linkedin': 'https://www.linkedin.com/in/alexmorgan',
+    'summary': 'Data engineer with eight years of experience building reliable batch and streaming pipelines, '
+               'mentoring engineers and partnering with analytics teams to ship trustworthy data products.',
+    'skills': 'Python, SQL, Apache Spark, Airflow, Kafka, AWS, Terraform, dbt, Data Modeling, Mentoring',
+    'work_experience': [
+        {'job_title': 'Senior Data Engineer', 'company': 'Northwind Analytics', 'duration': '2021 - Present',
+         'description': 'Designed a streaming ingestion platform processing 2B events per day\n'
+                        'Cut warehouse costs by 35% through partitioning and query tuning\n'
+                        'Mentored five engineers and led the on-call rotation'},
+        {'job_title': 'Data Engineer', 'company': 'Contoso Retail', 'duration': '2017 - 2021',
+         'description': 'Built Airflow pipelines feeding the company-wide reporting layer\n'
+                        'Migrated legacy ETL jobs from cron scripts to Spark on EMR'},
+    ],
+    'education': [
+        {'degree': 'B.Tech in Computer Science', 'institution': 'State Technical University', 'year': '2017', 'cgpa': '8.6'},
+    ],
+    'projects': [
+        {'project_name': 'Open-source data quality checks', 'live_link': '', 'github_link': 'https://github.com/example/dq',
+         'description': 'Declarative data quality assertions for dbt models\nUsed by 40+ teams'},
+    ],
+    'certifications': [
+        {'cert_name': 'AWS Certified Data Analytics', 'issuing_org': 'Amazon Web Services', 'date': '2022'},
+    ],
+}
+
+def time_generate_pdf(runs: int, data: dict = SAMPLE_RESUME) -> list:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        pdf_generator.generate_pdf(data)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def _summary(label: str, timings: list) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"{label:<22} mean {statistics.mean(timings) * 1000:7.1f} ms   p50 {statistics.median(timings) * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-PDF latency with and without the font cache.")
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    pdf_generator.FONT_CACHE_ENABLED = False
+    uncached = time_generate_pdf(args.runs)
+
+    pdf_generator.FONT_CACHE_ENABLED = True
+    time_generate_pdf(1)  # parse the font templates once, as the first request in a process would
+    cached = time_generate_pdf(args.runs)
+
+    print(_summary("fonts parsed per PDF", uncached))
+    print(_summary("cached font templates", cached))
+    print(f"speed-up: {statistics.mean(uncached) / statistics.mean(cached):.1f}x")
+
+if __name__ == "__main__":
+    main()
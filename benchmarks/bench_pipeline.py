@@ -0,0 +1,261 @@
+# file: benchmarks/bench_pipeline.py
+"""
+End-to-end stage benchmarks: latency percentiles, throughput and peak RSS
+for each stage of the production path, on synthetic resumes and job
+descriptions of several sizes.
+
+    render   builder.pdf_generator.generate_pdf
+    parse    reviewer.resume_parser.extract_text_from_pdf
+    extract  reviewer.ats_scoring.get_key_skills_from_jd_local
+    score    reviewer.ats_scoring.calculate_ats_score
+    suggest  reviewer.ai_suggestions.get_ai_suggestions (prompt building + a FakeGeminiModel call)
+
+Every run uses a different synthetic document, so per-document caches miss
+as they would for new uploads. Each stage runs in its own spawned process so
+its peak RSS (which includes loading the libraries and models it needs) is
+measured in isolation.
+
+    python -m benchmarks.bench_pipeline --runs 20 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_pipeline --runs 20 --baseline benchmarks/baseline.json --threshold 0.2
+
+Comparing against a baseline exits with status 1 if any stage's p50 or p95
+latency grew by more than the threshold.
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import sys
+import time
+
+STAGES = ("render", "parse", "extract", "score", "suggest")
+SIZES = ("small", "medium", "large")
+
+# (work experiences, bullets per experience, projects)
+RESUME_SHAPES = {"small": (1, 2, 1), "medium": (3, 4, 2), "large": (8, 8, 4)}
+# requirement lines in the job description
+JD_REQUIREMENTS = {"small": 5, "medium": 15, "large": 40}
+
+SKILLS = [
+    "Python", "SQL", "Apache Spark", "Airflow", "Kafka", "AWS", "Terraform", "dbt", "Docker", "Kubernetes",
+    "React", "TypeScript", "Node.js", "GraphQL", "PostgreSQL", "Redis", "Go", "Java", "Spring Boot", "CI/CD",
+    "Machine Learning", "PyTorch", "Data Modeling", "REST APIs", "Microservices", "Linux", "Git", "Snowflake",
+    "Tableau", "Agile", "Mentoring", "Stakeholder Management", "System Design", "Observability", "GCP", "Azure",
+]
+VERBS = ["Designed", "Built", "Migrated", "Led", "Automated", "Optimized", "Launched", "Scaled", "Refactored", "Owned"]
+OBJECTS = ["an ingestion pipeline", "the billing service", "a reporting layer", "the search API", "a feature store",
+           "the deployment platform", "an internal SDK", "the on-call rotation", "a data quality framework"]
+OUTCOMES = ["cutting costs by {n}%", "serving {n}M requests per day", "reducing latency by {n}%",
+            "for {n} internal teams", "improving reliability to 99.{n}%"]
+JD_BOILERPLATE = (
+    "We are an equal opportunity employer and value diversity at our company. We do not discriminate on the "
+    "basis of race, religion, color, national origin, gender, sexual orientation, age, marital status, veteran "
+    "status, or disability status. Benefits include health insurance, a learning budget and flexible hours."
+)
+
+# --- Synthetic inputs ---
+def _bullet(rng: random.Random) -> str:
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(SKILLS)}, {rng.choice(OUTCOMES).format(n=rng.randint(2, 95))}"
+
+def make_resume(index: int, size: str) -> dict:
+    """A deterministic synthetic resume in the builder's dict layout."""
+    rng = random.Random(f"resume-{size}-{index}")
+    jobs, bullets, projects = RESUME_SHAPES[size]
+    return {
+        'full_name': f"Candidate {index}",
+        'job_title': rng.choice(["Data Engineer", "Backend Engineer", "ML Engineer", "Full Stack Developer"]),
+        'email': f"candidate{index}@example.com",
+        'phone': f"+1 555 {1000 + index}",
+        'linkedin': f"https://www.linkedin.com/in/candidate{index}",
+        'summary': " ".join(_bullet(rng) + "." for _ in range(3)),
+        'skills': ", ".join(rng.sample(SKILLS, 10)),
+        'work_experience': [
+            {'job_title': rng.choice(["Senior Engineer", "Engineer", "Staff Engineer"]), 'company': f"Company {rng.randint(1, 999)}",
+             'duration': f"{2024 - 2 * (j + 1)} - {2024 - 2 * j}", 'description': "\n".join(_bullet(rng) for _ in range(bullets))}
+            for j in range(jobs)
+        ],
+        'education': [
+            {'degree': 'B.Tech in Computer Science', 'institution': 'State Technical University', 'year': '2015', 'cgpa': '8.1'},
+        ],
+        'projects': [
+            {'project_name': f"Project {p}", 'live_link': '', 'github_link': f"https://github.com/example/p{p}",
+             'description': "\n".join(_bullet(rng) for _ in range(2))}
+            for p in range(projects)
+        ],
+        'certifications': [
+            {'cert_name': 'AWS Certified Solutions Architect', 'issuing_org': 'Amazon Web Services', 'date': '2022'},
+        ],
+    }
+
+def resume_to_text(resume: dict) -> str:
+    """Plain text of a synthetic resume, roughly what the parser recovers from its PDF."""
+    lines = [resume['full_name'], resume['job_title'], resume['summary'], "Skills: " + resume['skills']]
+    for job in resume['work_experience']:
+        lines += [f"{job['job_title']} at {job['company']} ({job['duration']})"] + job['description'].splitlines()
+    for project in resume['projects']:
+        lines += [project['project_name']] + project['description'].splitlines()
+    return "\n".join(lines)
+
+def make_job_description(index: int, size: str) -> str:
+    """A deterministic synthetic job description; larger ones carry the usual boilerplate too."""
+    rng = random.Random(f"jd-{size}-{index}")
+    requirements = [
+        f"- {rng.randint(2, 8)}+ years of experience with {rng.choice(SKILLS)} and {rng.choice(SKILLS)}"
+        for _ in range(JD_REQUIREMENTS[size])
+    ]
+    text = f"Senior Engineer {index}\n\nAbout the role\n{_bullet(rng)}.\n\nRequirements\n" + "\n".join(requirements)
+    if size != "small":
+        text += "\n\n" + JD_BOILERPLATE
+    return text
+
+# --- Stage runners (each runs in a fresh spawned process) ---
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _stage_calls(stage: str, size: str, runs: int, gemini_latency: float) -> list:
+    """Builds the list of zero-argument calls to time for one stage."""
+    resumes = [make_resume(i, size) for i in range(runs)]
+    jds = [make_job_description(i, size) for i in range(runs)]
+
+    if stage == "render":
+        from builder.pdf_generator import generate_pdf
+        return [lambda resume=resume: generate_pdf(resume) for resume in resumes]
+
+    if stage == "parse":
+        from builder.pdf_generator import generate_pdf
+        from reviewer.resume_parser import extract_text_from_pdf
+        pdfs = [bytes(generate_pdf(resume)) for resume in resumes]
+        return [lambda data=data: extract_text_from_pdf(data) for data in pdfs]
+
+    if stage in ("extract", "score"):
+        from reviewer.ats_scoring import calculate_ats_score, get_key_skills_from_jd_local
+        from reviewer.models import get_keybert_model, get_sbert_model
+        if not get_sbert_model() or (stage == "extract" and not get_keybert_model()):
+            raise RuntimeError("local models are not available")
+        if stage == "extract":
+            return [lambda jd=jd: get_key_skills_from_jd_local(jd) for jd in jds]
+        texts = [resume_to_text(resume) for resume in resumes]
+        return [lambda text=text, jd=jd: calculate_ats_score(text, jd) for text, jd in zip(texts, jds)]
+
+    if stage == "suggest":
+        from reviewer.ai_suggestions import get_ai_suggestions
+        from reviewer.fake_gemini import FakeGeminiModel
+        model = FakeGeminiModel(first_chunk_delay=gemini_latency)
+        texts = [resume_to_text(resume) for resume in resumes]
+        return [
+            lambda text=text, jd=jd: get_ai_suggestions(text, jd, random.Random(jd).sample(SKILLS, 5), model=model)
+            for text, jd in zip(texts, jds)
+        ]
+
+    raise ValueError(f"unknown stage: {stage}")
+
+def run_stage(stage: str, size: str, runs: int, warmup: int, gemini_latency: float) -> dict:
+    """Times one stage; returns its raw timings and peak RSS, or why it was skipped."""
+    try:
+        calls = _stage_calls(stage, size, runs + warmup, gemini_latency)
+    except (ImportError, RuntimeError) as e:
+        return {"skipped": str(e)}
+
+    for call in calls[:warmup]:
+        call()
+    timings = []
+    started = time.perf_counter()
+    for call in calls[warmup:]:
+        call_started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    return {"timings": timings, "elapsed": elapsed, "peak_rss_mb": _peak_rss_mb()}
+
+# --- Reporting ---
+def _percentile(ordered: list, fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def summarize(raw: dict) -> dict:
+    if "skipped" in raw:
+        return raw
+    ordered = sorted(raw["timings"])
+    return {
+        "runs": len(ordered),
+        "p50_ms": _percentile(ordered, 0.50) * 1000,
+        "p95_ms": _percentile(ordered, 0.95) * 1000,
+        "p99_ms": _percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "throughput_per_s": len(ordered) / raw["elapsed"] if raw["elapsed"] else 0.0,
+        "peak_rss_mb": raw["peak_rss_mb"],
+    }
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Returns a message for every stage whose p50 or p95 latency regressed beyond threshold."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or "skipped" in current or "skipped" in previous:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            if previous[metric] > 0 and current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(
+                    f"{name} {metric}: {previous[metric]:.1f} -> {current[metric]:.1f} ms "
+                    f"(+{(current[metric] / previous[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+def _print_table(results: dict):
+    print(f"{'stage':<18}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'peak RSS MB':>14}")
+    for name, summary in results.items():
+        if "skipped" in summary:
+            print(f"{name:<18}skipped: {summary['skipped']}")
+            continue
+        print(f"{name:<18}{summary['p50_ms']:>10.1f}{summary['p95_ms']:>10.1f}{summary['p99_ms']:>10.1f}"
+              f"{summary['throughput_per_s']:>10.1f}{summary['peak_rss_mb']:>14.0f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latency, throughput and memory of each pipeline stage.")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=list(SIZES))
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per stage and size.")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed runs first (model loads, imports).")
+    parser.add_argument("--gemini-latency", type=float, default=0.2, help="Seconds the fake Gemini model takes per call.")
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed fractional slowdown vs the baseline.")
+    parser.add_argument("--save-baseline", help="Write the results as a new baseline to this file.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for stage in args.stages:
+        for size in args.sizes:
+            with context.Pool(1) as pool:
+                raw = pool.apply(run_stage, (stage, size, args.runs, args.warmup, args.gemini_latency))
+            results[f"{stage}/{size}"] = summarize(raw)
+
+    _print_table(results)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "gemini_latency": args.gemini_latency,
+        "results": results,
+    }
+    for path in filter(None, (args.json, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
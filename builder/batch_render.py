@@ -0,0 +1,148 @@
+# file: builder/batch_render.py
+"""
+Batch resume rendering: turns a JSONL file of resume records (one
+ResumeData-layout object per line) into PDFs, in parallel, streaming each
+finished PDF straight into a ZIP archive or a directory.
+
+    python -m builder.batch_render cohort.jsonl -o cohort.zip --report report.jsonl
+
+A record may carry an "id" used for the output file name; otherwise the
+line number is used.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .pdf_generator import ResumePDF, generate_pdf
+from .resume_data import ResumeData
+
+def _init_worker():
+    # Parse the fonts once per worker so every render reuses the cached templates
+    ResumePDF('P', 'mm', 'A4')
+
+def _render_record(line_no: int, line: str):
+    """Worker: renders one JSONL line. Returns (line_no, record_id, pdf_bytes, seconds, error)."""
+    started = time.perf_counter()
+    record_id = None
+    try:
+        record = json.loads(line)
+        record_id = record.get('id')
+        pdf_bytes = bytes(generate_pdf(ResumeData.from_dict(record)))
+        return line_no, record_id, pdf_bytes, time.perf_counter() - started, None
+    except Exception as e:
+        return line_no, record_id, None, time.perf_counter() - started, f"{type(e).__name__}: {e}"
+
+def _file_name(line_no: int, record_id) -> str:
+    if record_id:
+        safe = re.sub(r'[^A-Za-z0-9._-]+', '_', str(record_id)).strip('._')
+        if safe:
+            return f"{safe}.pdf"
+    return f"resume_{line_no:05d}.pdf"
+
+def _iter_records(records_path: str):
+    with open(records_path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, start=1):
+            if line.strip():
+                yield line_no, line
+
+class _ZipSink:
+    def __init__(self, path: str):
+        self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    def write(self, name: str, data: bytes):
+        self._zip.writestr(name, data)
+
+    def close(self):
+        self._zip.close()
+
+class _DirectorySink:
+    def __init__(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        self._path = path
+
+    def write(self, name: str, data: bytes):
+        with open(os.path.join(self._path, name), 'wb') as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+def render_batch(records_path: str, output: str, workers: int = None, on_result=None) -> list:
+    """
+    Renders every record in records_path into output (a .zip file, or a
+    directory otherwise). At most a few documents per worker are in flight,
+    so memory stays flat however large the batch is. Returns one report
+    dict per record; on_result(report) is also called as each completes.
+    """
+    workers = workers or os.cpu_count() or 1
+    sink = _ZipSink(output) if output.lower().endswith('.zip') else _DirectorySink(output)
+    reports = []
+    used_names = set()
+
+    def collect(future):
+        line_no, record_id, pdf_bytes, seconds, error = future.result()
+        report = {"line": line_no, "id": record_id, "render_s": round(seconds, 4)}
+        if error:
+            report["error"] = error
+        else:
+            name = _file_name(line_no, record_id)
+            if name in used_names:
+                name = f"{name[:-4]}_{line_no:05d}.pdf"
+            used_names.add(name)
+            sink.write(name, pdf_bytes)
+            report.update({"file": name, "bytes": len(pdf_bytes)})
+        reports.append(report)
+        if on_result:
+            on_result(report)
+
+    context = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+            in_flight = set()
+            for line_no, line in _iter_records(records_path):
+                if len(in_flight) >= workers * 4:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+                in_flight.add(pool.submit(_render_record, line_no, line))
+            for future in wait(in_flight).done:
+                collect(future)
+    finally:
+        sink.close()
+    return reports
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a JSONL file of resumes to PDFs.")
+    parser.add_argument("records", help="JSONL file, one resume record per line.")
+    parser.add_argument("-o", "--output", required=True, help="Output .zip file or directory.")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: CPU count).")
+    parser.add_argument("--report", default=None, help="Write per-document timings and failures to this JSONL file.")
+    args = parser.parse_args(argv)
+
+    report_file = open(args.report, 'w', encoding='utf-8') if args.report else None
+
+    def on_result(report):
+        if report_file:
+            report_file.write(json.dumps(report) + "\n")
+        if "error" in report:
+            print(f"line {report['line']}: {report['error']}")
+
+    started = time.perf_counter()
+    try:
+        reports = render_batch(args.records, args.output, args.workers, on_result)
+    finally:
+        if report_file:
+            report_file.close()
+
+    failed = sum(1 for r in reports if "error" in r)
+    elapsed = time.perf_counter() - started
+    print(f"Rendered {len(reports) - failed} of {len(reports)} resumes to {args.output} in {elapsed:.1f}s ({failed} failed)")
+
+if __name__ == "__main__":
+    main()
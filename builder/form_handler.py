@@ -1,13 +1,25 @@
 # file: builder/form_handler.py
 
 import streamlit as st
-import base64
 from .pdf_generator import generate_pdf
+from common import metrics
+from common.session_store import SESSION_STORE
+from .resume_data import ResumeData
 
-def get_pdf_download_link(pdf_bytes, filename="resume.pdf"):
-    """Generates a styled download link for the PDF."""
-    b64 = base64.b64encode(pdf_bytes).decode()
-    return f'<a href="data:application/octet-stream;base64,{b64}" download="{filename}" class="download-link">Download Your Resume PDF</a>'
+# Generated PDFs live in the shared SESSION_STORE, keyed by the content hash of
+# their input; sessions only keep the hash.
+def get_cached_pdf(content_hash):
+    return SESSION_STORE.get(content_hash)
+
+def render_pdf_cached(resume_data: ResumeData):
+    """Returns (content_hash, pdf_bytes), rendering only if this exact content isn't cached."""
+    content_hash = resume_data.content_hash()
+    pdf_bytes = get_cached_pdf(content_hash)
+    metrics.incr("cache_misses_total" if pdf_bytes is None else "cache_hits_total", cache="pdf")
+    if pdf_bytes is None:
+        pdf_bytes = bytes(generate_pdf(resume_data))
+        SESSION_STORE.put(content_hash, "pdf", pdf_bytes)
+    return content_hash, pdf_bytes
 
 def handle_resume_form():
     """Handles the dynamic form for building a resume."""
@@ -100,11 +112,25 @@ def handle_resume_form():
     st.markdown("---")
 
     if st.button("Generate Resume PDF", type="primary", use_container_width=True):
-        resume_data = {key: st.session_state.get(key, '') for key in st.session_state}
-        with st.spinner("Forging your professional resume..."):
-            pdf_bytes = generate_pdf(resume_data)
-            st.session_state.pdf_link = get_pdf_download_link(pdf_bytes)
+        with st.spinner("Forging your professional resume..."), metrics.profile_request("generate_pdf"):
+            # Only the hash lives in the session; the bytes stay in the shared cache
+            st.session_state.pdf_hash, _ = render_pdf_cached(ResumeData.from_session_state(st.session_state))
 
-    if 'pdf_link' in st.session_state:
-        st.success("Your resume is ready!")
-        st.markdown(st.session_state.pdf_link, unsafe_allow_html=True)
\ No newline at end of file
+    if 'pdf_hash' in st.session_state:
+        pdf_bytes = get_cached_pdf(st.session_state.pdf_hash)
+        if pdf_bytes is None:
+            # Evicted: rebuild it transparently if the form still holds the same content
+            resume_data = ResumeData.from_session_state(st.session_state)
+            if resume_data.content_hash() == st.session_state.pdf_hash:
+                _, pdf_bytes = render_pdf_cached(resume_data)
+        if pdf_bytes is None:
+            st.info("Your generated resume has expired. Click \"Generate Resume PDF\" again to rebuild it.")
+        else:
+            st.success("Your resume is ready!")
+            st.download_button(
+                "Download Your Resume PDF",
+                data=pdf_bytes,
+                file_name="resume.pdf",
+                mime="application/pdf",
+                use_container_width=True,
+            )
\ No newline at end of file
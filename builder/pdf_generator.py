@@ -1,18 +1,90 @@
 # file: builder/pdf_generator.py
 
-from fpdf import FPDF
+from fpdf import FPDF, FPDF_VERSION
+from fpdf.fonts import SubsetMap, TTFFont
+from .resume_data import ResumeData
+from common import metrics
+import copy
 import os
+import pickle
+import threading
 
 _PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 _FONT_PATH_REGULAR = os.path.abspath(os.path.join(_PROJECT_ROOT, 'assets', 'fonts', 'DejaVuSans.ttf'))
 _FONT_PATH_BOLD = os.path.abspath(os.path.join(_PROJECT_ROOT, 'assets', 'fonts', 'DejaVuSans-Bold.ttf'))
 
+# --- Process-level font cache ---
+# Parsing a TTF and building its glyph-width tables is the largest fixed cost
+# of a PDF. Each font is parsed once per process into a template; documents
+# get a copy with their own fontTools handle and subset map, because fpdf2
+# subsets (mutates) the font in place when the document is written out.
+# This resets TTFFont attributes that are fpdf2 internals, so it is only used
+# with the fpdf2 minor version it was written against (see requirements.txt
+# and tests/test_font_cache.py); any other version goes through add_font().
+_FONT_CACHE_FPDF_VERSION = "2.8."
+_FONT_CACHE_FIELDS = ('fontkey', 'i', 'biggest_size_pt', 'ttfont', 'missing_glyphs', 'subset')
+FONT_CACHE_ENABLED = FPDF_VERSION.startswith(_FONT_CACHE_FPDF_VERSION)
+_FONT_TEMPLATES = {}
+_FONT_SNAPSHOTS = {}
+_SUBSET_TABLES = ('cmap', 'glyf', 'loca', 'hmtx', 'post', 'head', 'hhea', 'maxp', 'OS/2', 'name')
+_font_cache_lock = threading.Lock()
+
+def _font_template(pdf, family, style, path):
+    fontkey = f"{family.lower()}{style}"
+    with _font_cache_lock:
+        template = _FONT_TEMPLATES.get(fontkey)
+        if template is None:
+            template = TTFFont(pdf, path, fontkey, style)
+            if not all(hasattr(template, field) for field in _FONT_CACHE_FIELDS):
+                return None
+            # Snapshot of the font with the tables the subsetter reads already
+            # decompiled; unpickling it is cheaper than parsing them again
+            for tag in _SUBSET_TABLES:
+                if tag in template.ttfont:
+                    template.ttfont[tag]
+            _FONT_SNAPSHOTS[fontkey] = pickle.dumps(template.ttfont, protocol=pickle.HIGHEST_PROTOCOL)
+            _FONT_TEMPLATES[fontkey] = template
+    return template
+
+def add_cached_font(pdf, family, style, path):
+    """Registers a TTF font on pdf, reusing the parsed metrics across documents."""
+    if not FONT_CACHE_ENABLED:
+        pdf.add_font(family, style, path, uni=True)
+        return
+    template = _font_template(pdf, family, style, path)
+    if template is None:
+        # TTFFont no longer has the layout this cache relies on
+        pdf.add_font(family, style, path, uni=True)
+        return
+    # Shallow copy: the metrics tables (cw, glyph_ids, cmap, desc) are only
+    # written while parsing, so every document can share them
+    font = copy.copy(template)
+    font.i = len(pdf.fonts) + 1
+    font.biggest_size_pt = 0
+    font.ttfont = pickle.loads(_FONT_SNAPSHOTS[template.fontkey])
+    font.missing_glyphs = []
+    font.subset = SubsetMap(font)
+    pdf.fonts[template.fontkey] = font
+
+# --- Layout measurement cache ---
+# String widths keyed by (font, size, spacing, stretching, text). Dates, years,
+# bullets and section labels repeat across entries and across documents.
+_STRING_WIDTHS = {}
+_STRING_WIDTHS_MAX = 8192
+
+# Colors used by the template
+_COLOR_HEADING = (44, 62, 80)
+_COLOR_BODY = (52, 73, 94)
+_COLOR_MUTED = (127, 140, 141)
+_COLOR_LINK = (82, 127, 141)
+_COLOR_WHITE = (255, 255, 255)
+
 class ResumePDF(FPDF):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         try:
-            self.add_font('DejaVu', '', _FONT_PATH_REGULAR, uni=True)
-            self.add_font('DejaVu', 'B', _FONT_PATH_BOLD, uni=True)
+            add_cached_font(self, 'DejaVu', '', _FONT_PATH_REGULAR)
+            add_cached_font(self, 'DejaVu', 'B', _FONT_PATH_BOLD)
             self.font_family = 'DejaVu'
         except RuntimeError as e:
             print(f"Font loading error: {e}. Falling back to Arial.")
@@ -23,27 +95,54 @@ class ResumePDF(FPDF):
         self.line_height = 5
         self.set_auto_page_break(auto=True, margin=15)
 
+    def header(self):
+        # Called by fpdf for every page, including automatic page breaks,
+        # so long resumes keep the left column on every page
+        self.draw_background()
+
     def draw_background(self):
         self.set_fill_color(44, 62, 80)
         self.rect(0, 0, self.left_col_width, self.h, 'F')
 
+    def apply_style(self, style, size, rgb):
+        """Sets font style/size and text color in one call."""
+        self.set_font(self.font_family, style, size)
+        self.set_text_color(*rgb)
+
+    def get_string_width(self, s, normalized=False, markdown=False):
+        if markdown or self.current_font is None:
+            return super().get_string_width(s, normalized, markdown)
+        key = (self.current_font.fontkey, self.font_size_pt, self.char_spacing, self.font_stretching, s)
+        width = _STRING_WIDTHS.get(key)
+        if width is None:
+            width = super().get_string_width(s, normalized, markdown)
+            if len(_STRING_WIDTHS) >= _STRING_WIDTHS_MAX:
+                _STRING_WIDTHS.clear()
+            _STRING_WIDTHS[key] = width
+        return width
+
     def add_main_header(self, name, title):
         self.set_xy(self.right_col_x, 15)
-        self.set_font(self.font_family, 'B', 26)
-        self.set_text_color(44, 62, 80)
+        self.apply_style('B', 26, _COLOR_HEADING)
         self.cell(0, 9, name, ln=True)
         self.set_x(self.right_col_x)
-        self.set_font(self.font_family, '', 11)
-        self.set_text_color(52, 73, 94)
+        self.apply_style('', 11, _COLOR_BODY)
         self.cell(0, 6, title, ln=True)
 
     def add_left_column_section(self, title):
         self.set_xy(10, self.get_y() + 5)
-        self.set_font(self.font_family, 'B', 12)
-        self.set_text_color(255, 255, 255)
+        self.apply_style('B', 12, _COLOR_WHITE)
         self.cell(self.left_col_width - 20, 8, title, ln=True, border='B')
         self.ln(2)
 
+    def add_left_column_list(self, items, marker):
+        """Renders a left-column bullet list as one text block (one layout pass)."""
+        if not items:
+            return
+        self.set_x(10)
+        self.set_font_size(9)
+        self.multi_cell(self.left_col_width - 20, self.line_height, "\n".join(f"{marker} {item}" for item in items))
+
     # --- NEW: Dedicated functions for different contact types ---
     def add_contact_item(self, icon, text):
         if not text: return
@@ -67,44 +166,42 @@ class ResumePDF(FPDF):
         current_y = self.get_y()
         if current_y < 40: current_y = 40
         self.set_xy(self.right_col_x, current_y + 4)
-        self.set_font(self.font_family, 'B', 14)
-        self.set_text_color(44, 62, 80)
+        self.apply_style('B', 14, _COLOR_HEADING)
         self.cell(0, 8, title, ln=True, border='B')
         self.ln(2)
 
+    def _add_right_aligned(self, text):
+        """Prints text flush against the right margin on the current line (dates, years)."""
+        self.apply_style('', 9, _COLOR_MUTED)
+        self.set_x(self.w - self.r_margin - self.get_string_width(text))
+        self.cell(0, self.line_height, text, ln=True)
+
     def add_experience_entry(self, title, subtitle, date, description, links=None):
         self.set_x(self.right_col_x)
-        self.set_font(self.font_family, 'B', 11)
-        self.set_text_color(52, 73, 94)
+        self.apply_style('B', 11, _COLOR_BODY)
         self.multi_cell(0, self.line_height, title)
         
         if subtitle:
             y_before = self.get_y()
             self.set_x(self.right_col_x)
-            self.set_font(self.font_family, '', 10)
+            self.apply_style('', 10, _COLOR_BODY)
             self.cell(0, self.line_height, subtitle)
             
             self.set_y(y_before)
-            self.set_font(self.font_family, '', 9)
-            self.set_text_color(127, 140, 141)
-            date_width = self.get_string_width(date)
-            x_pos = self.w - self.r_margin - date_width
-            self.set_x(x_pos)
-            self.cell(0, self.line_height, date, ln=True)
+            self._add_right_aligned(date)
         
         if links and any(links):
             self.ln(-1) 
             self.set_x(self.right_col_x)
-            self.set_font_size(8)
-            self.set_text_color(82, 127, 141)
+            self.apply_style(self.font_style, 8, _COLOR_LINK)
             link_text = " | ".join(filter(None, links))
             self.multi_cell(0, self.line_height - 1, link_text)
             self.set_font_size(10)
             self.ln(1)
 
         self.set_x(self.right_col_x)
-        self.set_font(self.font_family, '', 10)
-        self.set_text_color(52, 73, 94)
+        self.apply_style('', 10, _COLOR_BODY)
+        # All bullets go through a single multi_cell, so line breaking is one pass per block
         description_points = [f"• {line.strip()}" for line in description.split('\n') if line.strip()]
         self.multi_cell(0, self.line_height, "\n".join(description_points))
         self.ln(2)
@@ -115,84 +212,71 @@ class ResumePDF(FPDF):
 
         y_before = self.get_y()
         self.set_x(self.right_col_x)
-        self.set_font(self.font_family, 'B', 11)
-        self.set_text_color(52, 73, 94)
+        self.apply_style('B', 11, _COLOR_BODY)
         self.cell(0, self.line_height, degree)
 
         self.set_y(y_before)
-        self.set_font(self.font_family, '', 9)
-        self.set_text_color(127, 140, 141)
-        year_width = self.get_string_width(year)
-        x_pos = self.w - self.r_margin - year_width
-        self.set_x(x_pos)
-        self.cell(0, self.line_height, year, ln=True)
+        self._add_right_aligned(year)
 
         self.set_x(self.right_col_x)
-        self.set_font(self.font_family, '', 10)
-        self.set_text_color(52, 73, 94)
+        self.apply_style('', 10, _COLOR_BODY)
         self.multi_cell(0, self.line_height, subtitle)
         self.ln(2)
 
 # --- Main PDF Generation Function ---
+@metrics.timed("generate_pdf")
 def generate_pdf(data):
+    """Renders a resume. data is a ResumeData (a plain dict in the same layout is converted)."""
+    if not isinstance(data, ResumeData):
+        data = ResumeData.from_dict(data)
+
     pdf = ResumePDF('P', 'mm', 'A4')
-    pdf.add_page()
-    pdf.draw_background()
+    pdf.add_page() # header() paints the left column background
 
     # --- UPDATED: New logic for rendering the contact section reliably ---
     pdf.set_y(15)
     pdf.add_left_column_section("CONTACT")
-    pdf.add_contact_item("•", data.get('phone'))
-    pdf.add_contact_item("•", data.get('email'))
-    pdf.add_contact_link("•", data.get('linkedin')) # Uses the new link handler
+    pdf.add_contact_item("•", data.phone)
+    pdf.add_contact_item("•", data.email)
+    pdf.add_contact_link("•", data.linkedin) # Uses the new link handler
     pdf.ln(2) # Add some space after the contact section
 
-    if data.get('skills'):
+    if data.skills:
         pdf.add_left_column_section("SKILLS")
-        pdf.set_font_size(9)
-        for skill in data.get('skills').split(','):
-            if skill.strip():
-                pdf.set_x(10)
-                pdf.multi_cell(pdf.left_col_width - 20, pdf.line_height, f"✓ {skill.strip()}")
+        pdf.add_left_column_list([skill.strip() for skill in data.skills.split(',') if skill.strip()], "✓")
         pdf.ln(1)
 
-    if data.get('certifications'):
+    if data.certifications:
         pdf.add_left_column_section("CERTIFICATIONS")
-        pdf.set_font_size(9)
-        for cert in data.get('certifications', []):
-            if cert.get('cert_name'):
-                cert_text = f"{cert.get('cert_name', '')} - {cert.get('issuing_org', '')}"
-                pdf.set_x(10)
-                pdf.multi_cell(pdf.left_col_width - 20, pdf.line_height, f"★ {cert_text}")
+        pdf.add_left_column_list([f"{cert.cert_name} - {cert.issuing_org}" for cert in data.certifications if cert.cert_name], "★")
         pdf.ln(1)
 
     # Right Column
-    pdf.add_main_header(data.get('full_name', 'Your Name'), data.get('job_title', ''))
+    pdf.add_main_header(data.full_name or 'Your Name', data.job_title)
     
-    if data.get('summary'):
+    if data.summary:
         pdf.add_right_column_section("PROFESSIONAL SUMMARY")
         pdf.set_x(pdf.right_col_x)
-        pdf.set_font(pdf.font_family, '', 10)
-        pdf.set_text_color(52, 73, 94)
-        pdf.multi_cell(0, pdf.line_height, data.get('summary'))
+        pdf.apply_style('', 10, _COLOR_BODY)
+        pdf.multi_cell(0, pdf.line_height, data.summary)
 
-    if data.get('work_experience'):
+    if data.work_experience:
         pdf.add_right_column_section("EXPERIENCE")
-        for job in data.get('work_experience', []):
-            if job.get('job_title'):
-                pdf.add_experience_entry(job.get('job_title'), job.get('company'), job.get('duration'), job.get('description'))
+        for job in data.work_experience:
+            if job.job_title:
+                pdf.add_experience_entry(job.job_title, job.company, job.duration, job.description)
 
-    if data.get('projects'):
+    if data.projects:
         pdf.add_right_column_section("PROJECTS")
-        for proj in data.get('projects', []):
-            if proj.get('project_name'):
-                links = [proj.get('live_link'), proj.get('github_link')]
-                pdf.add_experience_entry(proj.get('project_name'), "", "", proj.get('description'), links=links)
+        for proj in data.projects:
+            if proj.project_name:
+                links = [proj.live_link, proj.github_link]
+                pdf.add_experience_entry(proj.project_name, "", "", proj.description, links=links)
 
-    if data.get('education'):
+    if data.education:
         pdf.add_right_column_section("EDUCATION")
-        for edu in data.get('education', []):
-            if edu.get('degree'):
-                pdf.add_education_entry(edu.get('degree'), edu.get('institution'), edu.get('year'), edu.get('cgpa'))
+        for edu in data.education:
+            if edu.degree:
+                pdf.add_education_entry(edu.degree, edu.institution, edu.year, edu.cgpa)
 
     return pdf.output()
\ No newline at end of file
@@ -0,0 +1,94 @@
+# file: builder/resume_data.py
+
+from dataclasses import asdict, dataclass, fields
+import hashlib
+import json
+
+def _text(value):
+    """Form values may be missing or None; the renderer always wants a string."""
+    return "" if value is None else str(value)
+
+@dataclass(frozen=True, slots=True)
+class WorkExperience:
+    job_title: str = ""
+    company: str = ""
+    duration: str = ""
+    description: str = ""
+
+@dataclass(frozen=True, slots=True)
+class Education:
+    degree: str = ""
+    institution: str = ""
+    year: str = ""
+    cgpa: str = ""
+
+@dataclass(frozen=True, slots=True)
+class Project:
+    project_name: str = ""
+    live_link: str = ""
+    github_link: str = ""
+    description: str = ""
+
+@dataclass(frozen=True, slots=True)
+class Certification:
+    cert_name: str = ""
+    issuing_org: str = ""
+    date: str = ""
+
+def _entries(cls, items):
+    names = [f.name for f in fields(cls)]
+    return tuple(cls(**{name: _text(item.get(name)) for name in names}) for item in items or ())
+
+@dataclass(frozen=True, slots=True)
+class ResumeData:
+    """
+    Everything the PDF renderer needs, and nothing else. Immutable, so it
+    hashes cheaply, and round-trips through plain dicts / JSON for batch
+    rendering.
+    """
+    full_name: str = ""
+    job_title: str = ""
+    email: str = ""
+    phone: str = ""
+    linkedin: str = ""
+    summary: str = ""
+    skills: str = ""
+    work_experience: tuple = ()
+    education: tuple = ()
+    projects: tuple = ()
+    certifications: tuple = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a ResumeData from the form/JSON dict layout, ignoring unknown keys."""
+        return cls(
+            full_name=_text(data.get('full_name')),
+            job_title=_text(data.get('job_title')),
+            email=_text(data.get('email')),
+            phone=_text(data.get('phone')),
+            linkedin=_text(data.get('linkedin')),
+            summary=_text(data.get('summary')),
+            skills=_text(data.get('skills')),
+            work_experience=_entries(WorkExperience, data.get('work_experience')),
+            education=_entries(Education, data.get('education')),
+            projects=_entries(Project, data.get('projects')),
+            certifications=_entries(Certification, data.get('certifications')),
+        )
+
+    @classmethod
+    def from_session_state(cls, session_state):
+        return cls.from_dict({f.name: session_state.get(f.name) for f in fields(cls)})
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    def to_dict(self):
+        return asdict(self)
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False)
+
+    def content_hash(self):
+        """Stable content hash, the same across processes (unlike hash())."""
+        return hashlib.sha256(self.to_json().encode('utf-8')).hexdigest()
@@ -0,0 +1,258 @@
+# file: common/metrics.py
+"""
+Process-wide timing spans, counters and cache gauges, shared by the reviewer
+and builder code paths.
+
+    with metrics.span("pdf_extract"):
+        ...
+    metrics.incr("errors_total", stage="gemini_generate")
+
+Exposed (opt-in, via environment variables) as:
+    RESUME_FORGE_METRICS_PORT      Prometheus text on http://127.0.0.1:<port>/metrics (JSON on /metrics.json)
+    RESUME_FORGE_METRICS_JSON      file the JSON snapshot is rewritten to every RESUME_FORGE_METRICS_INTERVAL seconds (default 60)
+    RESUME_FORGE_PROFILE_DIR       write a profile of every profile_request() block to this directory
+    RESUME_FORGE_PROFILER          cprofile (default, .prof files) or pyinstrument (.html files)
+"""
+
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.environ.get("RESUME_FORGE_METRICS_PORT", "0"))
+METRICS_JSON_PATH = os.environ.get("RESUME_FORGE_METRICS_JSON")
+METRICS_INTERVAL_SECONDS = float(os.environ.get("RESUME_FORGE_METRICS_INTERVAL", "60"))
+PROFILE_DIR = os.environ.get("RESUME_FORGE_PROFILE_DIR")
+PROFILER = os.environ.get("RESUME_FORGE_PROFILER", "cprofile")
+
+PREFIX = "resume_forge_"
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Recent samples kept per stage for the percentiles in the JSON snapshot
+RECENT_SAMPLES = 1024
+
+class _Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+
+    def summary(self) -> dict:
+        ordered = sorted(self.recent)
+        def percentile(fraction):
+            return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+        return {"count": self.count, "sum": self.total, "p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99)}
+
+class MetricsRegistry:
+    """Thread-safe counters, per-stage latency histograms and pull-based gauge collectors."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = {}
+
+    def incr(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            self._histograms.setdefault(stage, _Histogram()).observe(seconds)
+
+    def register_collector(self, name: str, collect):
+        """collect() returns a dict of numeric gauges, read at every export (e.g. a cache's stats())."""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def _collected(self) -> dict:
+        with self._lock:
+            collectors = dict(self._collectors)
+        gauges = {}
+        for name, collect in collectors.items():
+            try:
+                gauges[name] = {k: v for k, v in collect().items() if isinstance(v, (int, float))}
+            except Exception:
+                gauges[name] = {}
+        return gauges
+
+    def snapshot(self) -> dict:
+        gauges = self._collected()
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "stages": {stage: histogram.summary() for stage, histogram in self._histograms.items()},
+                "counters": [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in self._counters.items()],
+                "gauges": gauges,
+            }
+
+    def render_prometheus(self) -> str:
+        gauges = self._collected()
+        lines = []
+        with self._lock:
+            if self._histograms:
+                lines.append(f"# TYPE {PREFIX}stage_seconds histogram")
+            for stage, histogram in sorted(self._histograms.items()):
+                for bound, count in zip(BUCKETS, histogram.buckets):
+                    lines.append(f'{PREFIX}stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'{PREFIX}stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{PREFIX}stage_seconds_sum{{stage="{stage}"}} {histogram.total}')
+                lines.append(f'{PREFIX}stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {PREFIX}{name} counter")
+                    typed.add(name)
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{PREFIX}{name}{{{label_text}}} {value}" if label_text else f"{PREFIX}{name} {value}")
+        for collector, values in sorted(gauges.items()):
+            for key, value in sorted(values.items()):
+                metric = f"{PREFIX}{_sanitize(collector)}_{_sanitize(key)}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+def _sanitize(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Process-wide registry, shared by every Streamlit session on this server
+REGISTRY = MetricsRegistry()
+
+def incr(name: str, value: float = 1, **labels):
+    REGISTRY.incr(name, value, **labels)
+
+def register_collector(name: str, collect):
+    REGISTRY.register_collector(name, collect)
+
+@contextmanager
+def span(stage: str):
+    """Times the block as one observation of stage; exceptions also count as errors_total{stage}."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        incr("errors_total", stage=stage)
+        raise
+    finally:
+        REGISTRY.observe(stage, time.perf_counter() - started)
+
+def timed(stage: str):
+    """Decorator form of span()."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# --- Exporters ---
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+def _make_handler(registry: MetricsRegistry):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = registry.render_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(registry.snapshot()).encode("utf-8"), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+def _dump_json_forever(path: str, interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(REGISTRY.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError:
+            incr("errors_total", stage="metrics_dump")
+
+def start_exporters(port: int = METRICS_PORT, json_path: str = METRICS_JSON_PATH, interval: float = METRICS_INTERVAL_SECONDS):
+    """Starts the configured exporters (once per process); a no-op when none is configured."""
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    if port:
+        try:
+            server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(REGISTRY))
+        except OSError:
+            # Another process on this machine already serves the port
+            incr("errors_total", stage="metrics_server")
+        else:
+            threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    if json_path:
+        threading.Thread(target=_dump_json_forever, args=(json_path, interval), name="metrics-dump", daemon=True).start()
+
+# --- Opt-in per-request profiling ---
+@contextmanager
+def profile_request(name: str):
+    """Profiles the block into PROFILE_DIR when profiling is enabled; otherwise does nothing."""
+    if not PROFILE_DIR:
+        yield
+        return
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{_sanitize(name)}-{time.strftime('%Y%m%d-%H%M%S')}-{threading.get_ident()}")
+
+    if PROFILER == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            Profiler = None
+        if Profiler is not None:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                with open(f"{path}.html", "w") as f:
+                    f.write(profiler.output_html())
+            return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Only one cProfile profiler can be active at a time; skip overlapping requests
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(f"{path}.prof")
\ No newline at end of file
@@ -0,0 +1,151 @@
+# file: common/session_store.py
+"""
+Shared, size-bounded store for heavy per-session artifacts (extracted resume
+text, analysis results, rendered PDFs). Sessions keep only the artifact's
+content key in st.session_state; the bytes live here once per server, are
+shared by sessions with identical inputs, and are evicted LRU-first when the
+store is over its byte budget or after sitting unused for the idle TTL.
+
+    key = content_key("resume_text", pdf_sha256)
+    text = SESSION_STORE.get_or_compute(key, "resume_text", lambda: extract_text_from_pdf(upload))
+
+Callers pass a recompute function wherever the artifact can be rebuilt from
+what the session still holds; an evicted artifact without one reads as None.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from common import metrics
+
+MAX_BYTES = int(os.environ.get("RESUME_FORGE_SESSION_STORE_BYTES", str(256 * 1024 * 1024)))
+IDLE_TTL_SECONDS = float(os.environ.get("RESUME_FORGE_SESSION_STORE_TTL", str(30 * 60)))
+
+def content_key(*parts) -> str:
+    """Stable key for an artifact derived from these inputs."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _sizeof(value) -> int:
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+class _Artifact:
+    __slots__ = ("kind", "value", "size", "last_access")
+
+    def __init__(self, kind: str, value, size: int):
+        self.kind = kind
+        self.value = value
+        self.size = size
+        self.last_access = time.monotonic()
+
+class ArtifactStore:
+    """Thread-safe LRU bounded by total bytes, with idle-TTL expiry."""
+    def __init__(self, max_bytes: int = MAX_BYTES, idle_ttl_seconds: float = IDLE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl_seconds
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recomputes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _drop(self, key: str):
+        self._bytes -= self._entries.pop(key).size
+
+    def _expire_idle(self, now: float):
+        # Entries are kept in access order, so the idle ones are at the front
+        while self._entries:
+            key, artifact = next(iter(self._entries.items()))
+            if now - artifact.last_access <= self.idle_ttl:
+                break
+            self._drop(key)
+            self.expirations += 1
+
+    def put(self, key: str, kind: str, value):
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = _Artifact(kind, value, size)
+            self._bytes += size
+            self._expire_idle(time.monotonic())
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get(self, key: str):
+        if key is None:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            self._expire_idle(now)
+            artifact = self._entries.get(key)
+            if artifact is None:
+                self.misses += 1
+                return None
+            artifact.last_access = now
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return artifact.value
+
+    def get_or_compute(self, key: str, kind: str, compute=None):
+        """Returns the artifact, rebuilding and re-storing it with compute() if it was evicted."""
+        value = self.get(key)
+        if value is not None or key is None or compute is None:
+            return value
+        value = compute()
+        if value is not None:
+            with self._lock:
+                self.recomputes += 1
+            self.put(key, kind, value)
+        return value
+
+    def report(self) -> dict:
+        """Memory use per artifact kind, plus totals and hit/eviction counters."""
+        with self._lock:
+            kinds = {}
+            for artifact in self._entries.values():
+                usage = kinds.setdefault(artifact.kind, {"entries": 0, "bytes": 0})
+                usage["entries"] += 1
+                usage["bytes"] += artifact.size
+            return {
+                "kinds": kinds,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "recomputes": self.recomputes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def stats(self) -> dict:
+        """Flat numeric view of report(), for the metrics exporters."""
+        report = self.report()
+        flat = {key: value for key, value in report.items() if key != "kinds"}
+        for kind, usage in report["kinds"].items():
+            flat[f"{kind}_entries"] = usage["entries"]
+            flat[f"{kind}_bytes"] = usage["bytes"]
+        return flat
+
+# Process-wide instance, shared by every Streamlit session on this server
+SESSION_STORE = ArtifactStore()
+metrics.register_collector("session_store", SESSION_STORE.stats)
\ No newline at end of file
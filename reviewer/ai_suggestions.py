@@ -1,24 +1,24 @@
 # file: reviewer/ai_suggestions.py
 
 import streamlit as st
-import google.generativeai as genai
 import json
-
-# Configure the Gemini API key from Streamlit secrets
-try:
-    genai.configure(api_key=st.secrets["GOOGLE_API_KEY"])
-    GEMINI_MODEL = genai.GenerativeModel('gemini-1.5-flash-latest')
-except (KeyError, Exception):
-    GEMINI_MODEL = None
-
-def get_ai_suggestions(resume_text: str, job_description: str, missing_skills: list):
-    """
-    Uses Gemini to generate qualitative feedback and suggestions for a resume.
-    """
-    if not GEMINI_MODEL:
-        st.error("Gemini AI model is not configured. Please add your GOOGLE_API_KEY to the Streamlit secrets.")
-        return "AI Suggestions are unavailable."
-        
+from common import metrics
+from reviewer.models import GEMINI_MODEL_NAME, get_gemini_model
+from reviewer.prompt_prep import compact_inputs, record_report, settings_key
+from reviewer.response_cache import RESPONSE_CACHE, make_key
+
+# Bump whenever a prompt template changes so cached responses are not reused
+PROMPT_TEMPLATE_VERSION = 2
+
+def cache_key(gemini_model, kind: str, *inputs) -> str:
+    """Response cache key for a Gemini call of this kind; shared by the app and the bulk client."""
+    model_name = getattr(gemini_model, "model_name", GEMINI_MODEL_NAME)
+    return make_key(model_name, PROMPT_TEMPLATE_VERSION, settings_key(), kind, *inputs)
+
+def build_suggestions_prompt(resume_text: str, job_description: str, missing_skills: list) -> str:
+    """Builds the Gemini prompt for JD-targeted suggestions."""
+    resume_text, job_description, report = compact_inputs(resume_text, job_description)
+    record_report("suggestions", report)
     prompt = f"""
     You are an expert career coach and professional resume reviewer. Your task is to provide
     actionable feedback on a resume based on a specific job description.
@@ -51,25 +51,94 @@ def get_ai_suggestions(resume_text: str, job_description: str, missing_skills: l
     
     Keep your feedback constructive and professional.
     """
+    return prompt
+
+class SuggestionsUnavailableError(RuntimeError):
+    """
+    Gemini is not configured, or the request for suggestions or feedback
+    failed (then the underlying error is the __cause__).
+    """
+
+def fetch_ai_suggestions(resume_text: str, job_description: str, missing_skills: list, model=None) -> str:
+    """
+    Like get_ai_suggestions, but raises SuggestionsUnavailableError instead
+    of returning an error message, and never calls st.* itself, so it is
+    safe to run off the script thread. Failures are never cached.
+    """
+    gemini_model = model or get_gemini_model()
+    if not gemini_model:
+        raise SuggestionsUnavailableError("Gemini AI model is not configured. Please add your GOOGLE_API_KEY to the Streamlit secrets.")
+
+    def generate():
+        prompt = build_suggestions_prompt(resume_text, job_description, missing_skills)
+        with metrics.span("gemini_generate"):
+            response = gemini_model.generate_content(prompt)
+        return response.text, True
 
+    key = cache_key(gemini_model, "suggestions", resume_text, job_description, list(missing_skills))
     try:
-        response = GEMINI_MODEL.generate_content(prompt)
-        return response.text
+        return RESPONSE_CACHE.get_or_compute(key, generate)
     except Exception as e:
-        return f"Error generating AI suggestions: {e}"
-    
-
-# Add this new function to the bottom of reviewer/ai_suggestions.py
+        raise SuggestionsUnavailableError(f"Error generating AI suggestions: {e}") from e
 
-def get_general_ai_feedback(resume_text: str):
+def get_ai_suggestions(resume_text: str, job_description: str, missing_skills: list, model=None):
     """
-    Uses Gemini to generate a general quality review of a resume
-    when no job description is provided.
+    Uses Gemini to generate qualitative feedback and suggestions for a resume.
+    """
+    try:
+        return fetch_ai_suggestions(resume_text, job_description, missing_skills, model=model)
+    except SuggestionsUnavailableError as e:
+        if e.__cause__ is None:
+            st.error(str(e))
+            return "AI Suggestions are unavailable."
+        return str(e)
+
+def stream_ai_suggestions(resume_text: str, job_description: str, missing_skills: list, model=None):
+    """
+    Streaming variant of get_ai_suggestions: yields the markdown review in
+    chunks as Gemini produces them (for st.write_stream).
     """
-    if not GEMINI_MODEL:
+    gemini_model = model or get_gemini_model()
+    if not gemini_model:
         st.error("Gemini AI model is not configured. Please add your GOOGLE_API_KEY to the Streamlit secrets.")
-        return {"score": 0, "feedback": "AI Suggestions are unavailable."}
-        
+        yield "AI Suggestions are unavailable."
+        return
+
+    key = cache_key(gemini_model, "suggestions", resume_text, job_description, list(missing_skills))
+    cached = RESPONSE_CACHE.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    owner, inflight = RESPONSE_CACHE.begin(key)
+    if not owner:
+        # An identical request is already running (e.g. a concurrent rerun); wait for it
+        text = get_ai_suggestions(resume_text, job_description, missing_skills, model=gemini_model)
+        yield text
+        return
+
+    prompt = build_suggestions_prompt(resume_text, job_description, missing_skills)
+    parts, completed = [], False
+    try:
+        with metrics.span("gemini_stream"):
+            for chunk in gemini_model.generate_content(prompt, stream=True):
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+        completed = True
+    except Exception as e:
+        yield f"\n\nError generating AI suggestions: {e}"
+    finally:
+        # Only a fully received response is cached; an abandoned stream just releases waiters
+        RESPONSE_CACHE.finish(key, "".join(parts), cache=completed)
+    
+
+# Add this new function to the bottom of reviewer/ai_suggestions.py
+
+def build_general_feedback_prompt(resume_text: str) -> str:
+    """Builds the Gemini prompt for a general (no JD) quality review."""
+    resume_text, _, report = compact_inputs(resume_text)
+    record_report("general", report)
     prompt = f"""
     You are an expert career coach. Your task is to provide a general quality review of a resume.
     Do not ask for a job description. Analyze the resume on its own merits.
@@ -87,11 +156,63 @@ def get_general_ai_feedback(resume_text: str):
     Return your response as a JSON object with two keys: "score" (an integer) and "feedback" (a string in Markdown format).
     Example: {{"score": 85, "feedback": "### Strengths\\n- Your resume is well-structured...\\n### Areas for Improvement\\n- Consider quantifying achievements..."}}
     """
+    return prompt
+
+class FeedbackFormatError(ValueError):
+    """Gemini's reply was not the {"score", "feedback"} JSON object the prompt asks for."""
+
+def parse_feedback_json(text: str) -> dict:
+    """Parses and validates the general feedback reply; raises FeedbackFormatError."""
+    # Clean up the response to extract only the JSON part
+    json_str = text.strip().replace("```json", "").replace("```", "").strip()
+    try:
+        data = json.loads(json_str)
+    except json.JSONDecodeError as e:
+        raise FeedbackFormatError(f"reply is not valid JSON: {e}") from e
+    if not isinstance(data, dict) or not isinstance(data.get("feedback"), str):
+        raise FeedbackFormatError("reply must be an object with a string \"feedback\"")
+    try:
+        score = int(data.get("score"))
+    except (TypeError, ValueError):
+        raise FeedbackFormatError("reply must have an integer \"score\"") from None
+    if not 0 <= score <= 100:
+        raise FeedbackFormatError(f"score {score} is outside 0-100")
+    return {"score": score, "feedback": data["feedback"]}
+
+def fetch_general_ai_feedback(resume_text: str, model=None) -> dict:
+    """
+    Like get_general_ai_feedback, but raises SuggestionsUnavailableError
+    instead of returning a score-0 error result, and never calls st.*
+    itself. Failures are never cached.
+    """
+    gemini_model = model or get_gemini_model()
+    if not gemini_model:
+        raise SuggestionsUnavailableError("Gemini AI model is not configured. Please add your GOOGLE_API_KEY to the Streamlit secrets.")
+
+    def generate():
+        prompt = build_general_feedback_prompt(resume_text)
+        with metrics.span("gemini_generate"):
+            response = gemini_model.generate_content(prompt)
+        try:
+            return parse_feedback_json(response.text), True
+        except FeedbackFormatError:
+            metrics.incr("errors_total", stage="gemini_feedback_parse")
+            raise
 
     try:
-        response = GEMINI_MODEL.generate_content(prompt)
-        # Clean up the response to extract only the JSON part
-        json_str = response.text.strip().replace("```json", "").replace("```", "").strip()
-        return json.loads(json_str)
+        return RESPONSE_CACHE.get_or_compute(cache_key(gemini_model, "general", resume_text), generate)
     except Exception as e:
-        return {"score": 0, "feedback": f"Error generating AI feedback: {e}"}
\ No newline at end of file
+        raise SuggestionsUnavailableError(f"Error generating AI feedback: {e}") from e
+
+def get_general_ai_feedback(resume_text: str, model=None):
+    """
+    Uses Gemini to generate a general quality review of a resume
+    when no job description is provided.
+    """
+    try:
+        return fetch_general_ai_feedback(resume_text, model=model)
+    except SuggestionsUnavailableError as e:
+        if e.__cause__ is None:
+            st.error(str(e))
+            return {"score": 0, "feedback": "AI Suggestions are unavailable."}
+        return {"score": 0, "feedback": str(e)}
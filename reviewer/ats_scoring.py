@@ -1,69 +1,327 @@
 # file: reviewer/ats_scoring.py
 
+import os
+import re
+import threading
+
+import numpy as np
 import streamlit as st
-from sentence_transformers import SentenceTransformer, util
-from keybert import KeyBERT
-
-# Preload SBERT model once (used by both KeyBERT and for matching)
-try:
-    SBERT_MODEL = SentenceTransformer("all-MiniLM-L6-v2")
-    # Initialize KeyBERT with the SBERT model
-    KEYBERT_MODEL = KeyBERT(model=SBERT_MODEL)
-except Exception as e:
-    st.error(f"Error loading sentence model: {e}")
-    SBERT_MODEL = None
-    KEYBERT_MODEL = None
-
-def get_key_skills_from_jd_local(job_description: str) -> list:
+from common import metrics
+from reviewer.embedding_cache import EMBEDDING_CACHE
+from reviewer.models import EMBEDDING_MODEL_ID, get_keybert_model, get_sbert_model
+from reviewer.resume_index import ResumeIndex, content_hash
+from reviewer.skill_index import extract_skills_from_index, split_sentences
+
+# JD skill extraction engine: "keybert" (embeds every 1-3-gram of the JD) or
+# "taxonomy" (matches JD sentences against the precomputed skill vocabulary).
+# The taxonomy engine falls back to KeyBERT when it finds nothing.
+SKILL_ENGINE = os.environ.get("RESUME_FORGE_SKILL_ENGINE", "keybert")
+
+# Resume chunking: sentences longer than this many words are split into
+# overlapping windows so each chunk fits the model's max sequence length.
+CHUNK_MAX_WORDS = 120
+CHUNK_OVERLAP_WORDS = 20
+
+# Cosine similarity above which a JD skill counts as present in the resume
+SIMILARITY_THRESHOLD = 0.4
+
+# ResumeIndex (written by bulk_screen --index) whose stored document embeddings
+# are reused for returning resumes instead of encoding them again
+RESUME_INDEX_DIR = os.environ.get("RESUME_FORGE_RESUME_INDEX")
+_resume_index = None
+_resume_index_lock = threading.Lock()
+
+# Several job descriptions pasted into one box are separated by a line of dashes
+JD_SEPARATOR = re.compile(r"^\s*-{3,}\s*$", re.MULTILINE)
+
+def get_key_skills_from_jd_local(job_description: str, engine: str = None) -> list:
+    """Extracts key skills and phrases from the JD with the configured local engine."""
+    if (engine or SKILL_ENGINE) == "taxonomy":
+        try:
+            skills = extract_skills_from_index(job_description)
+            if skills:
+                return skills
+        except Exception as e:
+            metrics.incr("errors_total", stage="skill_index")
+            st.error(f"Error extracting skills from the skill index: {e}")
+    return get_key_skills_with_keybert(job_description)
+
+def get_key_skills_with_keybert(job_description: str) -> list:
     """Uses a local KeyBERT model to extract key skills and phrases."""
-    if not KEYBERT_MODEL:
+    keybert_model = get_keybert_model()
+    if not keybert_model:
         return []
     try:
-        keywords = KEYBERT_MODEL.extract_keywords(
-            job_description,
-            keyphrase_ngram_range=(1, 3), # Find skills up to 3 words long
-            stop_words='english',
-            top_n=15 # Extract the top 15 skills
-        )
+        with metrics.span("keybert_extract"):
+            keywords = keybert_model.extract_keywords(
+                job_description,
+                keyphrase_ngram_range=(1, 3), # Find skills up to 3 words long
+                stop_words='english',
+                top_n=15 # Extract the top 15 skills
+            )
         # KeyBERT returns a list of tuples (keyword, score), we just need the keyword
         return [kw[0] for kw in keywords]
     except Exception as e:
         st.error(f"Error extracting local keywords: {e}")
         return []
 
-def calculate_ats_score(resume_text: str, job_description: str):
+def get_key_skills_from_jds_local(job_descriptions: list, engine: str = None) -> list:
     """
-    Calculates ATS score using a LOCAL keyword extraction model.
-    NO API CALLS are made in this function.
+    Extracts key skills for several JDs. KeyBERT embeds all the JDs and
+    their candidate phrases in one call instead of one run per JD.
+    Returns one skill list per JD.
     """
-    if not job_description:
-        return {"score": 0, "matched_skills": [], "missing_skills": [], "feedback": "Please provide a job description."}
+    skills = [[] for _ in job_descriptions]
+    if (engine or SKILL_ENGINE) == "taxonomy":
+        for i, job_description in enumerate(job_descriptions):
+            try:
+                skills[i] = extract_skills_from_index(job_description)
+            except Exception as e:
+                metrics.incr("errors_total", stage="skill_index")
+                st.error(f"Error extracting skills from the skill index: {e}")
+    pending = [i for i, found in enumerate(skills) if not found]
+    if pending:
+        for i, found in zip(pending, get_key_skills_with_keybert_many([job_descriptions[i] for i in pending])):
+            skills[i] = found
+    return skills
 
-    if not SBERT_MODEL:
-        return {"score": 0, "matched_skills": [], "missing_skills": [], "feedback": "Sentence model not loaded."}
-        
-    jd_skills = get_key_skills_from_jd_local(job_description)
-    if not jd_skills:
-        return {"score": 0, "matched_skills": [], "missing_skills": [], "feedback": "Could not extract skills from the job description."}
-    
-    resume_embedding = SBERT_MODEL.encode(resume_text)
-    matched_skills = []
-    missing_skills = []
-    
-    for skill in jd_skills:
-        skill_embedding = SBERT_MODEL.encode(skill)
-        similarity = util.pytorch_cos_sim(skill_embedding, resume_embedding).item()
-        
-        if similarity > 0.4:
+def get_key_skills_with_keybert_many(job_descriptions: list) -> list:
+    """Runs KeyBERT over a list of JDs in a single batched call."""
+    if len(job_descriptions) == 1:
+        return [get_key_skills_with_keybert(job_descriptions[0])]
+    keybert_model = get_keybert_model()
+    if not keybert_model:
+        return [[] for _ in job_descriptions]
+    try:
+        with metrics.span("keybert_extract"):
+            keywords = keybert_model.extract_keywords(
+                job_descriptions,
+                keyphrase_ngram_range=(1, 3),
+                stop_words='english',
+                top_n=15
+            )
+        return [[kw[0] for kw in doc_keywords] for doc_keywords in keywords]
+    except Exception as e:
+        st.error(f"Error extracting local keywords: {e}")
+        return [[] for _ in job_descriptions]
+
+def encode_texts(texts: list):
+    """
+    Encodes texts through the shared embedding cache, one batched call for
+    the misses, keyed by the model id of the backend that encodes them.
+    """
+    model = get_sbert_model()
+    return EMBEDDING_CACHE.encode(model, model.model_id, texts)
+
+def cos_sim(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Cosine similarity matrix between the rows of a and the rows of b."""
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return a @ b.T
+
+def chunk_resume(resume_text: str) -> list:
+    """
+    Splits a resume into sentence/line chunks so no part of it is lost to
+    the model's max sequence length. Sentences longer than CHUNK_MAX_WORDS
+    are cut into overlapping word windows.
+    """
+    chunks = []
+    step = CHUNK_MAX_WORDS - CHUNK_OVERLAP_WORDS
+    for sentence in split_sentences(resume_text):
+        words = sentence.split()
+        if len(words) <= CHUNK_MAX_WORDS:
+            chunks.append(sentence)
+            continue
+        for start in range(0, len(words), step):
+            chunks.append(" ".join(words[start:start + CHUNK_MAX_WORDS]))
+            if start + CHUNK_MAX_WORDS >= len(words):
+                break
+    return chunks
+
+def get_resume_index():
+    """
+    The ResumeIndex at RESUME_INDEX_DIR, opened read-only for lookups and
+    reopened after bulk_screen appends to it; None if there is none, or if
+    it holds another model's vectors.
+    """
+    if not RESUME_INDEX_DIR or not os.path.exists(os.path.join(RESUME_INDEX_DIR, "index.json")):
+        return None
+    meta_path = os.path.join(RESUME_INDEX_DIR, "meta.jsonl")
+    version = os.path.getmtime(meta_path) if os.path.exists(meta_path) else 0
+    global _resume_index
+    with _resume_index_lock:
+        if _resume_index is None or _resume_index[0] != version:
+            try:
+                _resume_index = (version, ResumeIndex(RESUME_INDEX_DIR, model_name=EMBEDDING_MODEL_ID))
+            except ValueError:
+                metrics.incr("errors_total", stage="resume_index")
+                _resume_index = (version, None)
+        return _resume_index[1]
+
+def embed_documents(texts: list) -> np.ndarray:
+    """
+    Document-level embeddings: the normalized mean of each text's chunk
+    embeddings, from one batched encode over all chunks. Texts already in
+    the resume index are looked up there instead of being encoded.
+    """
+    index = get_resume_index()
+    stored = {}
+    if index is not None:
+        for i, text in enumerate(texts):
+            hit = index.get(content_hash(text or ""))
+            if hit is not None:
+                stored[i] = hit[0]
+        metrics.incr("cache_hits_total", len(stored), cache="resume_index")
+    pending = [i for i in range(len(texts)) if i not in stored]
+    if pending:
+        stored.update(zip(pending, _encode_documents([texts[i] for i in pending])))
+    return np.vstack([stored[i] for i in range(len(texts))])
+
+def _encode_documents(texts: list) -> np.ndarray:
+    text_chunks = [chunk_resume(text or "") or [""] for text in texts]
+    embeddings = encode_texts([chunk for chunks in text_chunks for chunk in chunks])
+    embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+    documents, offset = [], 0
+    for chunks in text_chunks:
+        documents.append(embeddings[offset:offset + len(chunks)].mean(axis=0))
+        offset += len(chunks)
+    return np.vstack(documents)
+
+def embed_document(text: str) -> np.ndarray:
+    return embed_documents([text])[0]
+
+def match_skills(resume_texts: list, jd_skills: list) -> list:
+    """
+    Matches JD skills against one or more resumes in a single batched pass.
+    The skills and every resume chunk are encoded in one call and scored
+    with one skills x chunks matrix; a skill's score for a resume is its
+    best score over that resume's chunks.
+    Returns a (matched_skills, missing_skills, evidence) tuple per resume,
+    where evidence maps each matched skill to its best-matching chunk.
+    """
+    resume_chunks = [chunk_resume(text or "") for text in resume_texts]
+    all_chunks = [chunk for chunks in resume_chunks for chunk in chunks]
+    if not all_chunks or not jd_skills:
+        return [([], list(jd_skills), {}) for _ in resume_texts]
+
+    embeddings = encode_texts(list(jd_skills) + all_chunks)
+    similarities = cos_sim(embeddings[:len(jd_skills)], embeddings[len(jd_skills):])
+
+    results = []
+    offset = 0
+    for chunks in resume_chunks:
+        if not chunks:
+            results.append(([], list(jd_skills), {}))
+            continue
+        results.append(_split_by_similarity(jd_skills, chunks, similarities[:, offset:offset + len(chunks)]))
+        offset += len(chunks)
+    return results
+
+def _split_by_similarity(skills: list, chunks: list, similarities: np.ndarray) -> tuple:
+    """Splits skills into matched/missing from a skills x chunks similarity matrix."""
+    best_scores = similarities.max(axis=1)
+    best_chunks = similarities.argmax(axis=1)
+
+    matched_skills, missing_skills, evidence = [], [], {}
+    for row, skill in enumerate(skills):
+        if best_scores[row] > SIMILARITY_THRESHOLD:
             matched_skills.append(skill)
+            evidence[skill] = chunks[best_chunks[row]]
         else:
             missing_skills.append(skill)
-            
-    score = (len(matched_skills) / len(jd_skills)) * 100 if jd_skills else 0
-    
+    return matched_skills, missing_skills, evidence
+
+def _build_score_result(matched_skills: list, missing_skills: list, evidence: dict) -> dict:
+    total = len(matched_skills) + len(missing_skills)
+    score = (len(matched_skills) / total) * 100 if total else 0
     return {
         "score": int(score),
         "matched_skills": matched_skills,
         "missing_skills": missing_skills,
-        "feedback": f"Your resume covers {len(matched_skills)} of the {len(jd_skills)} key skills identified in the job description."
-    }
\ No newline at end of file
+        "evidence": evidence,
+        "feedback": f"Your resume covers {len(matched_skills)} of the {total} key skills identified in the job description."
+    }
+
+def calculate_ats_scores(resume_texts: list, job_description: str, jd_skills: list = None) -> list:
+    """
+    Scores many resumes against one job description. The JD skills are
+    extracted once and matched against every resume in a single batch.
+    Pass jd_skills to reuse skills already extracted for this JD.
+    """
+    if not job_description:
+        return [{"score": 0, "matched_skills": [], "missing_skills": [], "feedback": "Please provide a job description."} for _ in resume_texts]
+
+    if not get_sbert_model():
+        return [{"score": 0, "matched_skills": [], "missing_skills": [], "feedback": "Sentence model not loaded."} for _ in resume_texts]
+
+    if jd_skills is None:
+        jd_skills = get_key_skills_from_jd_local(job_description)
+    if not jd_skills:
+        return [{"score": 0, "matched_skills": [], "missing_skills": [], "feedback": "Could not extract skills from the job description."} for _ in resume_texts]
+
+    return [_build_score_result(*match) for match in match_skills(resume_texts, jd_skills)]
+
+def calculate_ats_score(resume_text: str, job_description: str):
+    """
+    Calculates ATS score using a LOCAL keyword extraction model.
+    NO API CALLS are made in this function.
+    """
+    return calculate_ats_scores([resume_text], job_description)[0]
+
+
+def split_job_descriptions(text: str) -> list:
+    """Splits pasted text into separate JDs on lines of three or more dashes."""
+    return [part.strip() for part in JD_SEPARATOR.split(text or "") if part.strip()]
+
+def job_title(job_description: str, max_length: int = 60) -> str:
+    """A short label for a JD: its first non-empty line."""
+    first_line = next((line.strip() for line in job_description.splitlines() if line.strip()), "")
+    return first_line if len(first_line) <= max_length else first_line[:max_length - 1] + "…"
+
+def rank_job_descriptions(resume_text: str, job_descriptions: list) -> list:
+    """
+    Scores one resume against many job descriptions in a single pass.
+    The resume is chunked and encoded once, skills for all JDs are
+    extracted in one batch, and the resume chunks plus the deduplicated
+    skills of every JD go through one encode and one similarity matrix.
+    Returns one score result per non-blank JD (with its index in
+    job_descriptions and a short title), best match first.
+    """
+    # Blank entries are skipped but keep their place, so jd_index points into the caller's list
+    indexes = [index for index, jd in enumerate(job_descriptions) if jd and jd.strip()]
+    job_descriptions = [job_descriptions[index] for index in indexes]
+    if not job_descriptions:
+        return []
+    if not get_sbert_model():
+        # Same shape as a scored ranking, so callers can index and title every JD
+        return [
+            {"score": 0, "matched_skills": [], "missing_skills": [], "evidence": {}, "feedback": "Sentence model not loaded.",
+             "jd_index": index, "title": job_title(job_description) or f"Job {index + 1}"}
+            for index, job_description in zip(indexes, job_descriptions)
+        ]
+
+    jd_skills = get_key_skills_from_jds_local(job_descriptions)
+    unique_skills = list(dict.fromkeys(skill for skills in jd_skills for skill in skills))
+    chunks = chunk_resume(resume_text or "")
+
+    if unique_skills and chunks:
+        embeddings = encode_texts(unique_skills + chunks)
+        similarities = cos_sim(embeddings[:len(unique_skills)], embeddings[len(unique_skills):])
+    skill_rows = {skill: row for row, skill in enumerate(unique_skills)}
+
+    rankings = []
+    for index, job_description, skills in zip(indexes, job_descriptions, jd_skills):
+        if not skills:
+            result = {"score": 0, "matched_skills": [], "missing_skills": [], "evidence": {},
+                      "feedback": "Could not extract skills from the job description."}
+        elif not chunks:
+            result = _build_score_result([], list(skills), {})
+        else:
+            rows = [skill_rows[skill] for skill in skills]
+            result = _build_score_result(*_split_by_similarity(skills, chunks, similarities[rows]))
+        result.update(jd_index=index, title=job_title(job_description) or f"Job {index + 1}")
+        rankings.append(result)
+
+    rankings.sort(key=lambda result: result["score"], reverse=True)
+    return rankings
\ No newline at end of file
@@ -0,0 +1,171 @@
+# file: reviewer/bulk_screen.py
+"""
+Headless bulk screening: scores a directory of resume PDFs against one or
+more job descriptions and streams the results to a JSONL file.
+
+    python -m reviewer.bulk_screen resumes/ --jd backend.txt --jd data.txt -o results.jsonl
+
+Re-running with the same output file skips every (resume, JD) pair that is
+already scored, so an interrupted run picks up where it stopped and files
+that failed to parse are retried.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import reviewer.resume_parser as resume_parser
+from reviewer.ats_scoring import calculate_ats_scores, embed_documents, get_key_skills_from_jd_local
+from reviewer.models import EMBEDDING_MODEL_ID, get_sbert_model
+from reviewer.resume_index import ResumeIndex, content_hash
+
+DEFAULT_BATCH_SIZE = 32
+
+def _init_extract_worker():
+    # Each worker handles whole files; don't fan pages out to another pool
+    resume_parser.PARALLEL_PAGE_THRESHOLD = sys.maxsize
+
+def _extract_worker(path: str):
+    started = time.perf_counter()
+    try:
+        return path, resume_parser.extract_text_from_pdf(path), time.perf_counter() - started, None
+    except Exception as e:
+        return path, "", time.perf_counter() - started, f"{type(e).__name__}: {e}"
+
+def find_resumes(resume_dir: str) -> list:
+    """Returns every PDF under resume_dir, sorted for a stable processing order."""
+    paths = []
+    for root, _, files in os.walk(resume_dir):
+        paths.extend(os.path.join(root, name) for name in files if name.lower().endswith('.pdf'))
+    return sorted(paths)
+
+def load_completed(output_path: str) -> set:
+    """Reads the (resume, jd) pairs already scored, ignoring a torn last line and failed rows."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "error" not in record:
+                done.add((record["resume"], record["jd"]))
+    return done
+
+def _iter_batches(items, batch_size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _add_to_index(index_dir: str, resume_dir: str, batch: list, index=None):
+    """Stores the embeddings of the successfully extracted resumes in the batch."""
+    extracted = [(path, text) for path, text, _, error in batch if error is None]
+    if index is not None:
+        extracted = [(path, text) for path, text in extracted if content_hash(text) not in index]
+    if not extracted:
+        return index
+    embeddings = embed_documents([text for _, text in extracted])
+    if index is None:
+        index = ResumeIndex(index_dir, embeddings.shape[1], EMBEDDING_MODEL_ID)
+    index.add(embeddings, [{"hash": content_hash(text), "resume": os.path.relpath(path, resume_dir)} for path, text in extracted])
+    return index
+
+def screen(resume_dir: str, jd_paths: list, output_path: str, workers: int = None, batch_size: int = DEFAULT_BATCH_SIZE, index_dir: str = None) -> int:
+    """
+    Scores every pending (resume, JD) pair and appends it to output_path.
+    With index_dir, the resume embeddings are also kept in a ResumeIndex.
+    Returns the number of results written.
+    """
+    if get_sbert_model() is None:
+        # Every score would be a placeholder 0; stop before writing any
+        raise RuntimeError("the sentence model could not be loaded, so no resume can be scored")
+    # Keyed by path (relative to the working directory), so same-named JDs in different directories stay distinct
+    job_descriptions = {}
+    for jd_path in jd_paths:
+        with open(jd_path, encoding='utf-8') as f:
+            job_descriptions[os.path.relpath(jd_path)] = f.read()
+    jd_skills = {name: get_key_skills_from_jd_local(text) for name, text in job_descriptions.items()}
+
+    done = load_completed(output_path)
+    # A resume is extracted only if at least one of its JD results is missing
+    pending = {}
+    for path in find_resumes(resume_dir):
+        resume = os.path.relpath(path, resume_dir)
+        missing_jds = [jd for jd in job_descriptions if (resume, jd) not in done]
+        if missing_jds:
+            pending[path] = missing_jds
+    if not pending:
+        return 0
+
+    index = ResumeIndex(index_dir, model_name=EMBEDDING_MODEL_ID) if index_dir and os.path.exists(os.path.join(index_dir, "index.json")) else None
+    written = 0
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_extract_worker) as pool, \
+            open(output_path, 'a+', encoding='utf-8') as out:
+        # Terminate a line torn by a crash so new records start cleanly
+        if out.tell() > 0:
+            out.seek(out.tell() - 1)
+            if out.read(1) != "\n":
+                out.write("\n")
+        # Extraction runs ahead in the workers while batches are scored here
+        extracted = pool.map(_extract_worker, list(pending), chunksize=4)
+        for batch in _iter_batches(extracted, batch_size):
+            if index_dir:
+                index = _add_to_index(index_dir, resume_dir, batch, index)
+            for jd_name, jd_text in job_descriptions.items():
+                rows = [item for item in batch if jd_name in pending[item[0]]]
+                # Rows without JD skills are written as errors, so a later run retries them
+                skills_error = None if jd_skills[jd_name] else "Could not extract skills from the job description."
+                scorable = [item for item in rows if item[3] is None and not skills_error]
+                started = time.perf_counter()
+                scores = calculate_ats_scores([item[1] for item in scorable], jd_text, jd_skills[jd_name])
+                score_seconds = (time.perf_counter() - started) / max(len(scorable), 1)
+                results = dict(zip((item[0] for item in scorable), scores))
+
+                for path, _, extract_seconds, error in rows:
+                    record = {"resume": os.path.relpath(path, resume_dir), "jd": jd_name}
+                    if error or skills_error:
+                        record["error"] = error or skills_error
+                    else:
+                        result = results[path]
+                        record.update({
+                            "score": result["score"],
+                            "matched_skills": result["matched_skills"],
+                            "missing_skills": result["missing_skills"],
+                        })
+                    record["timings"] = {"extract_s": round(extract_seconds, 4), "score_s": round(score_seconds, 4)}
+                    out.write(json.dumps(record) + "\n")
+                    written += 1
+            out.flush()
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a directory of resume PDFs against job descriptions.")
+    parser.add_argument("resume_dir", help="Directory containing resume PDFs (searched recursively).")
+    parser.add_argument("--jd", action="append", required=True, help="Job description text file. Repeat for several JDs.")
+    parser.add_argument("-o", "--output", default="screening_results.jsonl", help="JSONL file to append results to.")
+    parser.add_argument("--workers", type=int, default=None, help="Extraction worker processes (default: CPU count).")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Resumes embedded per batch.")
+    parser.add_argument("--index", default=None, help="Also store resume embeddings in this ResumeIndex directory.")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        written = screen(args.resume_dir, args.jd, args.output, args.workers, args.batch_size, args.index)
+    except RuntimeError as e:
+        sys.exit(f"error: {e}")
+    print(f"Wrote {written} results to {args.output} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# file: reviewer/embedding_backend.py
+"""
+Selectable sentence-embedding backends. Every backend exposes the subset of
+SentenceTransformer.encode() the app uses, so the embedding cache, the
+skill index and KeyBERT work with any of them.
+
+    RESUME_FORGE_EMBEDDING_BACKEND   torch (default) or onnx
+    RESUME_FORGE_ONNX_MODEL_DIR      local directory with model.onnx + tokenizer files
+    RESUME_FORGE_ONNX_QUANTIZE       1 to run a dynamically int8-quantized copy of the model
+    RESUME_FORGE_EMBEDDING_THREADS   intra-op threads (default: library default)
+    RESUME_FORGE_EMBEDDING_BATCH_SIZE  texts per forward pass (default 64)
+    RESUME_FORGE_EMBEDDING_SERVER    URL of a shared reviewer.embedding_server; the
+                                     in-process backend is used only if it is unreachable
+
+Export the ONNX model once with:
+
+    python -m reviewer.embedding_backend export models/all-MiniLM-L6-v2-onnx
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.request
+
+import numpy as np
+from common import metrics
+
+BACKEND = os.environ.get("RESUME_FORGE_EMBEDDING_BACKEND", "torch")
+ONNX_MODEL_DIR = os.environ.get("RESUME_FORGE_ONNX_MODEL_DIR", os.path.join("models", "all-MiniLM-L6-v2-onnx"))
+ONNX_QUANTIZE = os.environ.get("RESUME_FORGE_ONNX_QUANTIZE", "0") == "1"
+NUM_THREADS = int(os.environ.get("RESUME_FORGE_EMBEDDING_THREADS", "0"))
+BATCH_SIZE = int(os.environ.get("RESUME_FORGE_EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_SERVER = os.environ.get("RESUME_FORGE_EMBEDDING_SERVER")
+
+# After the embedding server fails, stay on the local backend this long before retrying it
+SERVER_RETRY_SECONDS = 30
+
+# all-MiniLM-L6-v2 truncates at 256 word pieces
+MAX_SEQ_LENGTH = 256
+
+def backend_id(model_name: str) -> str:
+    """Identifies model + backend variant, for cache keys: embeddings differ slightly between them."""
+    if BACKEND == "onnx":
+        return f"{model_name}:onnx-int8" if ONNX_QUANTIZE else f"{model_name}:onnx"
+    return model_name
+
+class EmbeddingModelMismatchError(RuntimeError):
+    """Raised when the embedding server encodes with a different model or backend than this process expects."""
+
+class TorchBackend:
+    """The original in-process SentenceTransformer (fp32 PyTorch)."""
+    def __init__(self, model_name: str, num_threads: int = NUM_THREADS, batch_size: int = BATCH_SIZE):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.model = SentenceTransformer(model_name)
+        self.model_id = model_name
+        self.batch_size = batch_size
+
+    def encode(self, texts, batch_size: int = None, convert_to_numpy: bool = True, **kwargs):
+        return self.model.encode(texts, batch_size=batch_size or self.batch_size, convert_to_numpy=True, **kwargs)
+
+class OnnxBackend:
+    """
+    ONNX Runtime inference of the exported transformer, with the same mean
+    pooling + L2 normalization as the SentenceTransformer pipeline.
+    """
+    def __init__(self, model_id: str, model_dir: str = ONNX_MODEL_DIR, quantize: bool = ONNX_QUANTIZE,
+                 num_threads: int = NUM_THREADS, batch_size: int = BATCH_SIZE):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_path = os.path.join(model_dir, "model.onnx")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"{model_path} not found; run `python -m reviewer.embedding_backend export {model_dir}` first.")
+        if quantize:
+            model_path = quantize_model(model_path)
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.batch_size = batch_size
+        self.model_id = model_id
+
+    def _encode_batch(self, texts):
+        tokens = self.tokenizer(texts, padding=True, truncation=True, max_length=MAX_SEQ_LENGTH, return_tensors="np")
+        feeds = {name: tokens[name].astype(np.int64) for name in self.input_names if name in tokens}
+        last_hidden_state = self.session.run(None, feeds)[0]
+        mask = tokens["attention_mask"][..., None].astype(np.float32)
+        pooled = (last_hidden_state * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def encode(self, texts, batch_size: int = None, convert_to_numpy: bool = True, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        batch_size = batch_size or self.batch_size
+        # Sorting by length keeps padding (and wasted compute) per batch small
+        order = np.argsort([len(text) for text in texts])
+        embeddings = np.empty((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            batch = self._encode_batch([texts[i] for i in rows])
+            if embeddings.shape[1] == 0:
+                embeddings = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+            embeddings[rows] = batch
+        return embeddings[0] if single else embeddings
+
+class RemoteBackend:
+    """
+    Client for reviewer.embedding_server. Replies from a server running a
+    different model_id are refused: their vectors are not comparable with
+    the ones already cached and indexed under this model_id.
+    """
+    def __init__(self, url: str, model_id: str, timeout: float = 30):
+        self.url = url.rstrip("/")
+        self.model_id = model_id
+        self.timeout = timeout
+
+    def encode(self, texts, batch_size: int = None, convert_to_numpy: bool = True, **kwargs):
+        from reviewer.embedding_server import unpack_embeddings
+
+        single = isinstance(texts, str)
+        body = json.dumps({"texts": [texts] if single else list(texts)}).encode("utf-8")
+        request = urllib.request.Request(f"{self.url}/encode", data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            reply = json.loads(response.read())
+        if reply.get("model") != self.model_id:
+            raise EmbeddingModelMismatchError(f"embedding server at {self.url} runs {reply.get('model')!r}, expected {self.model_id!r}")
+        embeddings = unpack_embeddings(reply["embeddings"])
+        return embeddings[0] if single else embeddings
+
+class FallbackBackend:
+    """
+    Uses the shared embedding server, and falls back to an in-process
+    backend (loaded only when first needed) while the server is unreachable
+    or serving another model. Both must produce remote.model_id vectors.
+    """
+    def __init__(self, remote, load_local):
+        self.remote = remote
+        self.model_id = remote.model_id
+        self._load_local = load_local
+        self._local = None
+        self._lock = threading.Lock()
+        self._remote_down_until = 0.0
+
+    def _local_backend(self):
+        with self._lock:
+            if self._local is None:
+                local = self._load_local()
+                if local.model_id != self.model_id:
+                    raise EmbeddingModelMismatchError(f"local embedding backend is {local.model_id!r}, expected {self.model_id!r}")
+                self._local = local
+            return self._local
+
+    def encode(self, texts, batch_size: int = None, convert_to_numpy: bool = True, **kwargs):
+        if time.monotonic() >= self._remote_down_until:
+            try:
+                return self.remote.encode(texts)
+            except (OSError, EmbeddingModelMismatchError):
+                # Connection refused, timeouts and HTTP errors all derive from OSError
+                metrics.incr("errors_total", stage="embedding_server")
+                self._remote_down_until = time.monotonic() + SERVER_RETRY_SECONDS
+        return self._local_backend().encode(texts, batch_size=batch_size, **kwargs)
+
+def quantize_model(model_path: str) -> str:
+    """Writes (once) and returns a dynamically int8-quantized copy of an ONNX model."""
+    quantized_path = model_path.replace(".onnx", "_int8.onnx")
+    if not os.path.exists(quantized_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+    return quantized_path
+
+def load_backend(model_name: str, use_server: bool = True):
+    """Creates the configured backend (behind the shared server, if one is configured)."""
+    if use_server and EMBEDDING_SERVER:
+        remote = RemoteBackend(EMBEDDING_SERVER, backend_id(model_name))
+        return FallbackBackend(remote, lambda: load_backend(model_name, use_server=False))
+    if BACKEND == "onnx":
+        return OnnxBackend(backend_id(model_name))
+    if BACKEND == "torch":
+        return TorchBackend(model_name)
+    raise ValueError(f"Unknown embedding backend: {BACKEND}")
+
+def make_keybert_embedder(backend):
+    """Wraps a backend so KeyBERT uses it instead of loading its own model."""
+    from keybert.backend import BaseEmbedder
+
+    class BackendEmbedder(BaseEmbedder):
+        def __init__(self):
+            super().__init__()
+            self.embedding_model = backend
+
+        def embed(self, documents, verbose=False):
+            return backend.encode(documents)
+
+    return BackendEmbedder()
+
+def export_onnx(model_name: str, output_dir: str):
+    """Exports the SentenceTransformer's transformer to ONNX next to its tokenizer."""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    hub_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    tokenizer = AutoTokenizer.from_pretrained(hub_name)
+    model = AutoModel.from_pretrained(hub_name).eval()
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer.save_pretrained(output_dir)
+
+    sample = tokenizer(["an example sentence"], return_tensors="pt")
+    names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model, tuple(sample[name] for name in names), os.path.join(output_dir, "model.onnx"),
+            input_names=names, output_names=["last_hidden_state"], dynamic_axes=dynamic_axes, opset_version=14,
+        )
+
+def main(argv=None):
+    from reviewer.models import SBERT_MODEL_NAME
+
+    parser = argparse.ArgumentParser(description="Manage the local ONNX embedding model.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_cmd = commands.add_parser("export", help="Export the sentence model to ONNX.")
+    export_cmd.add_argument("output_dir", nargs="?", default=ONNX_MODEL_DIR)
+    export_cmd.add_argument("--quantize", action="store_true", help="Also write the int8-quantized model.")
+    args = parser.parse_args(argv)
+
+    export_onnx(SBERT_MODEL_NAME, args.output_dir)
+    if args.quantize:
+        quantize_model(os.path.join(args.output_dir, "model.onnx"))
+    print(f"Exported {SBERT_MODEL_NAME} to {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# file: reviewer/embedding_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from common import metrics
+
+# Size of the in-process tier and location of the optional on-disk tier.
+# Leave RESUME_FORGE_EMBEDDING_CACHE_DB unset to keep the cache memory-only.
+DEFAULT_MAX_ENTRIES = int(os.environ.get("RESUME_FORGE_EMBEDDING_CACHE_SIZE", "4096"))
+DEFAULT_DB_PATH = os.environ.get("RESUME_FORGE_EMBEDDING_CACHE_DB")
+
+def normalize_text(text: str) -> str:
+    """Collapses whitespace and case so trivially different inputs share a key."""
+    # all-MiniLM-L6-v2 uses an uncased tokenizer, so lowercasing does not change the embedding
+    return " ".join(text.split()).lower()
+
+def make_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache with a bounded LRU memory tier and an
+    optional sqlite tier that survives restarts.
+    """
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, db_path: str = None):
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+            self._db.commit()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str):
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+            if self._db is not None:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector
+            self.misses += 1
+            return None
+
+    def put_many(self, items: list):
+        with self._lock:
+            for key, vector in items:
+                self._remember(key, vector)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in items],
+                )
+                self._db.commit()
+
+    def encode(self, model, model_name: str, texts: list, **encode_kwargs) -> np.ndarray:
+        """
+        Returns a (len(texts), dim) float32 matrix, encoding only the texts
+        that are not cached yet, in one batched call.
+        """
+        keys = [make_key(model_name, text) for text in texts]
+        vectors = [self.get(key) for key in keys]
+
+        # Encode each distinct missing text once, even if it repeats in this batch
+        pending = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                pending.setdefault(keys[i], texts[i])
+        if pending:
+            with metrics.span("sbert_encode"):
+                encoded = model.encode(list(pending.values()), convert_to_numpy=True, **encode_kwargs)
+            new_items = [(key, np.asarray(vec, dtype=np.float32)) for key, vec in zip(pending, encoded)]
+            self.put_many(new_items)
+            fresh = dict(new_items)
+            vectors = [fresh[keys[i]] if vector is None else vector for i, vector in enumerate(vectors)]
+
+        return np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+# Process-wide instance, shared by every Streamlit session on this server
+EMBEDDING_CACHE = EmbeddingCache(DEFAULT_MAX_ENTRIES, DEFAULT_DB_PATH)
+metrics.register_collector("embedding_cache", EMBEDDING_CACHE.stats)
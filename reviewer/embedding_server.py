@@ -0,0 +1,145 @@
+# file: reviewer/embedding_server.py
+"""
+Shared local embedding service: one model copy per machine instead of one
+per Streamlit process. Concurrent /encode requests are gathered into
+micro-batches (up to --max-batch texts, waiting at most --max-wait-ms for
+more) and run as a single forward pass.
+
+    python -m reviewer.embedding_server --port 8765
+
+Point the app at it with RESUME_FORGE_EMBEDDING_SERVER=http://127.0.0.1:8765.
+The server uses the same RESUME_FORGE_EMBEDDING_* backend settings as the app.
+"""
+
+import argparse
+import base64
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT_MS = 10
+
+def pack_embeddings(embeddings: np.ndarray) -> dict:
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    return {"shape": list(embeddings.shape), "data": base64.b64encode(embeddings.tobytes()).decode("ascii")}
+
+def unpack_embeddings(payload: dict) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(payload["data"]), dtype=np.float32).reshape(payload["shape"])
+
+class MicroBatcher:
+    """Collects encode requests from many threads and runs them in shared batches."""
+    def __init__(self, model, max_batch: int = DEFAULT_MAX_BATCH, max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._requests = queue.Queue()
+        self.batches = 0
+        self.texts = 0
+        threading.Thread(target=self._run, name="micro-batcher", daemon=True).start()
+
+    def submit(self, texts: list) -> Future:
+        future = Future()
+        self._requests.put((texts, future))
+        return future
+
+    def _collect(self):
+        batch = [self._requests.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                embeddings = np.asarray(self.model.encode(texts, convert_to_numpy=True), dtype=np.float32)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.texts += len(texts)
+            offset = 0
+            for request_texts, future in batch:
+                future.set_result(embeddings[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+def make_handler(batcher: MicroBatcher, model_id: str):
+    class EmbeddingHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, body: dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"model": model_id, "batches": batcher.batches, "texts": batcher.texts})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/encode":
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                texts = [str(text) for text in request["texts"]]
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {"error": f"bad request: {e}"})
+                return
+            if not texts:
+                self._send_json(200, {"model": model_id, "embeddings": pack_embeddings(np.empty((0, 0)))})
+                return
+            try:
+                embeddings = batcher.submit(texts).result()
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+                return
+            self._send_json(200, {"model": model_id, "embeddings": pack_embeddings(embeddings)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return EmbeddingHandler
+
+def serve(host: str, port: int, max_batch: int, max_wait_ms: float):
+    from reviewer.embedding_backend import load_backend
+    from reviewer.models import SBERT_MODEL_NAME
+
+    backend = load_backend(SBERT_MODEL_NAME, use_server=False)
+    batcher = MicroBatcher(backend, max_batch, max_wait_ms)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher, backend.model_id))
+    print(f"Serving {backend.model_id} embeddings on http://{host}:{port}")
+    server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared embedding server with dynamic micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="Maximum texts per forward pass.")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS, help="How long a batch waits for more requests.")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.max_batch, args.max_wait_ms)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# file: reviewer/fake_gemini.py
+"""
+Local stand-in for genai.GenerativeModel, for exercising the Gemini code
+paths without an API key, network access or cost:
+
+    model = FakeGeminiModel("### **Overall Impression**\\nSolid resume.", first_chunk_delay=0.3, chunk_delay=0.05)
+    for chunk in stream_ai_suggestions(resume_text, jd, missing, model=model):
+        ...
+
+replies and errors script successive calls, e.g. for exercising retries and
+JSON re-asks in reviewer.gemini_client:
+
+    FakeGeminiModel(replies=["not json", '{"score": 80, "feedback": "Good"}'], errors=[TimeoutError()])
+"""
+
+import asyncio
+import time
+
+class FakeChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeResponse:
+    """Mimics GenerateContentResponse: iterable of chunks when streamed, .text otherwise."""
+    def __init__(self, chunks: list, first_chunk_delay: float, chunk_delay: float, stream: bool):
+        self._chunks = chunks
+        self._first_chunk_delay = first_chunk_delay
+        self._chunk_delay = chunk_delay
+        self._text = None
+        if not stream:
+            # A blocking call pays for the whole generation up front
+            time.sleep(first_chunk_delay + chunk_delay * max(len(chunks) - 1, 0))
+            self._text = "".join(chunks)
+
+    def __iter__(self):
+        for i, chunk in enumerate(self._chunks):
+            time.sleep(self._first_chunk_delay if i == 0 else self._chunk_delay)
+            yield FakeChunk(chunk)
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._chunks)
+        return self._text
+
+class FakeGeminiModel:
+    """
+    Emits a canned response split into chunk_size-character chunks, sleeping
+    first_chunk_delay before the first chunk and chunk_delay between the rest.
+    Calls first raise the queued errors, one per call, then return the queued
+    replies in order, then text.
+    """
+    def __init__(self, text: str = "### **Overall Impression**\nThis is a fake review.", chunk_size: int = 20,
+                 first_chunk_delay: float = 0.0, chunk_delay: float = 0.0, model_name: str = "models/fake-gemini",
+                 replies: list = None, errors: list = None):
+        self.model_name = model_name
+        self.text = text
+        self.chunk_size = chunk_size
+        self.first_chunk_delay = first_chunk_delay
+        self.chunk_delay = chunk_delay
+        self.replies = list(replies or [])
+        self.errors = list(errors or [])
+        self.prompts = []
+
+    def _next_chunks(self, prompt: str) -> list:
+        self.prompts.append(prompt)
+        if self.errors:
+            raise self.errors.pop(0)
+        text = self.replies.pop(0) if self.replies else self.text
+        return [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or [""]
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        chunks = self._next_chunks(prompt)
+        return FakeResponse(chunks, self.first_chunk_delay, self.chunk_delay, stream)
+
+    async def generate_content_async(self, prompt: str):
+        """Mimics GenerativeModel.generate_content_async (non-streaming)."""
+        chunks = self._next_chunks(prompt)
+        await asyncio.sleep(self.first_chunk_delay + self.chunk_delay * max(len(chunks) - 1, 0))
+        return FakeResponse(chunks, 0.0, 0.0, stream=False)
@@ -0,0 +1,197 @@
+# file: reviewer/gemini_client.py
+"""
+Async Gemini client for bulk AI feedback: many requests in flight at once,
+bounded by a concurrency limit and a requests-per-minute limit, with
+jittered exponential backoff on transient errors and a bounded re-ask when
+a quality-score reply is not valid JSON.
+
+    results = run_feedback_batch(resume_texts)                   # list of {"score", "feedback"}
+    results = run_feedback_batch(resume_texts, model=FakeGeminiModel(text='{"score": 70, "feedback": "ok"}'))
+
+Replies share the response cache with the app, so a resume already reviewed
+in the UI (or in an earlier batch) is not sent again.
+
+    python -m reviewer.gemini_client path/to/resumes -o feedback.jsonl --rpm 60 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from common import metrics
+from reviewer.ai_suggestions import (
+    FeedbackFormatError,
+    build_general_feedback_prompt,
+    build_suggestions_prompt,
+    cache_key,
+    parse_feedback_json,
+)
+from reviewer.models import get_gemini_model
+from reviewer.response_cache import RESPONSE_CACHE
+
+REQUESTS_PER_MINUTE = float(os.environ.get("RESUME_FORGE_GEMINI_RPM", "60"))
+MAX_CONCURRENCY = int(os.environ.get("RESUME_FORGE_GEMINI_CONCURRENCY", "8"))
+MAX_RETRIES = int(os.environ.get("RESUME_FORGE_GEMINI_RETRIES", "4"))
+# Seconds one Gemini call may take before it counts as a (retryable) timeout
+REQUEST_TIMEOUT_SECONDS = float(os.environ.get("RESUME_FORGE_GEMINI_TIMEOUT", "60"))
+# Extra attempts when the quality-score reply is not the requested JSON
+MAX_JSON_REASKS = 1
+
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+
+# Transient failures worth retrying; matched by class name so google-api-core stays optional here
+RETRYABLE_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+    "InternalServerError", "GatewayTimeout", "Aborted",
+}
+
+REASK_INSTRUCTION = (
+    "\n\nYour previous reply could not be used: {error}. Reply again with ONLY the JSON object, "
+    "with an integer \"score\" from 0 to 100 and a string \"feedback\", and no other text."
+)
+
+def is_retryable(error: Exception) -> bool:
+    return isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)) or type(error).__name__ in RETRYABLE_ERRORS
+
+class RateLimiter:
+    """Spaces request starts evenly so no more than requests_per_minute begin in any minute."""
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class GeminiClient:
+    """
+    Bounded-concurrency, rate-limited access to a Gemini model. Create one
+    per event loop (its semaphore and limiter belong to that loop).
+    """
+    def __init__(self, model=None, requests_per_minute: float = REQUESTS_PER_MINUTE,
+                 max_concurrency: int = MAX_CONCURRENCY, max_retries: int = MAX_RETRIES,
+                 timeout: float = REQUEST_TIMEOUT_SECONDS):
+        self.model = model or get_gemini_model()
+        if self.model is None:
+            raise RuntimeError("Gemini AI model is not configured. Add GOOGLE_API_KEY to the Streamlit secrets.")
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._limiter = RateLimiter(requests_per_minute)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _call(self, prompt: str) -> str:
+        if hasattr(self.model, "generate_content_async"):
+            response = await self.model.generate_content_async(prompt)
+        else:
+            response = await asyncio.to_thread(self.model.generate_content, prompt)
+        return response.text
+
+    async def generate(self, prompt: str) -> str:
+        """One completion, retried with full-jitter exponential backoff on transient errors."""
+        for attempt in range(self.max_retries + 1):
+            await self._limiter.acquire()
+            try:
+                async with self._semaphore:
+                    with metrics.span("gemini_generate"):
+                        # A timed-out threaded call keeps running in its thread; only the wait is abandoned
+                        return await asyncio.wait_for(self._call(prompt), timeout=self.timeout)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                metrics.incr("retries_total", stage="gemini_generate")
+                await asyncio.sleep(random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)))
+
+    async def general_feedback(self, resume_text: str) -> dict:
+        """Quality score and feedback for one resume, re-asking (boundedly) for invalid JSON."""
+        key = cache_key(self.model, "general", resume_text)
+        cached = RESPONSE_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        base_prompt = build_general_feedback_prompt(resume_text)
+        prompt = base_prompt
+        for attempt in range(MAX_JSON_REASKS + 1):
+            reply = await self.generate(prompt)
+            try:
+                result = parse_feedback_json(reply)
+            except FeedbackFormatError as e:
+                metrics.incr("errors_total", stage="gemini_feedback_parse")
+                if attempt == MAX_JSON_REASKS:
+                    raise
+                prompt = base_prompt + REASK_INSTRUCTION.format(error=e)
+                continue
+            RESPONSE_CACHE.put(key, result)
+            return result
+
+    async def suggestions(self, resume_text: str, job_description: str, missing_skills: list) -> str:
+        """Markdown suggestions for one resume against a job description."""
+        key = cache_key(self.model, "suggestions", resume_text, job_description, list(missing_skills))
+        cached = RESPONSE_CACHE.get(key)
+        if cached is not None:
+            return cached
+        text = await self.generate(build_suggestions_prompt(resume_text, job_description, missing_skills))
+        RESPONSE_CACHE.put(key, text)
+        return text
+
+    async def feedback_batch(self, resume_texts: list) -> list:
+        """
+        Reviews every resume concurrently. Results are in input order; a
+        resume whose request ultimately failed gets the exception instead.
+        """
+        return await asyncio.gather(*(self.general_feedback(text) for text in resume_texts), return_exceptions=True)
+
+def run_feedback_batch(resume_texts: list, model=None, **client_kwargs) -> list:
+    """Synchronous entry point for GeminiClient.feedback_batch."""
+    async def run():
+        return await GeminiClient(model, **client_kwargs).feedback_batch(resume_texts)
+    return asyncio.run(run())
+
+def main(argv=None):
+    from reviewer.resume_parser import extract_text_from_pdf
+
+    parser = argparse.ArgumentParser(description="Generate AI quality scores for a directory of resume PDFs.")
+    parser.add_argument("resume_dir")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file with one result per resume.")
+    parser.add_argument("--rpm", type=float, default=REQUESTS_PER_MINUTE, help="Requests per minute.")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY, help="Requests in flight at once.")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT_SECONDS, help="Seconds per Gemini call.")
+    args = parser.parse_args(argv)
+
+    paths = sorted(
+        os.path.join(args.resume_dir, name) for name in os.listdir(args.resume_dir) if name.lower().endswith(".pdf")
+    )
+    # A corrupt, encrypted or oversized PDF is recorded as that file's error; the rest are still reviewed
+    results = {}
+    texts = {}
+    for path in paths:
+        try:
+            texts[path] = extract_text_from_pdf(path)
+        except Exception as e:
+            results[path] = e
+    feedback = run_feedback_batch(
+        list(texts.values()), requests_per_minute=args.rpm, max_concurrency=args.concurrency, timeout=args.timeout
+    )
+    results.update(zip(texts, feedback))
+
+    with open(args.output, "w") as f:
+        for path in paths:
+            result = results[path]
+            row = {"file": os.path.basename(path)}
+            row.update({"error": f"{type(result).__name__}: {result}"} if isinstance(result, Exception) else result)
+            f.write(json.dumps(row) + "\n")
+    failed = sum(isinstance(result, Exception) for result in results.values())
+    print(f"Reviewed {len(paths) - failed} of {len(paths)} resumes -> {args.output}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
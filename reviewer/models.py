@@ -0,0 +1,102 @@
+# file: reviewer/models.py
+
+import importlib
+import os
+import threading
+import time
+
+import streamlit as st
+from common import metrics
+from reviewer import embedding_backend
+
+SBERT_MODEL_NAME = "all-MiniLM-L6-v2"
+# Model + backend variant (torch / onnx / onnx-int8); used wherever embeddings are cached or stored
+EMBEDDING_MODEL_ID = embedding_backend.backend_id(SBERT_MODEL_NAME)
+GEMINI_MODEL_NAME = "gemini-1.5-flash-latest"
+
+# Set RESUME_FORGE_WARMUP=1 to start loading the local models in a
+# background thread as soon as the app starts, instead of on first use.
+WARMUP_ENABLED = os.environ.get("RESUME_FORGE_WARMUP", "0") == "1"
+
+# Seconds spent per import / model load, in the order they happened
+_STARTUP_TIMINGS = {}
+_warmup_thread = None
+
+def _record(name: str, started: float):
+    _STARTUP_TIMINGS[name] = time.perf_counter() - started
+    metrics.incr("model_loads_total", model=name.removeprefix("load "))
+    metrics.REGISTRY.observe("model_load", _STARTUP_TIMINGS[name])
+
+def _timed_import(module_name: str):
+    """Imports a module, recording its cost the first time it is actually loaded."""
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    _STARTUP_TIMINGS.setdefault(f"import {module_name}", time.perf_counter() - started)
+    return module
+
+# --- Lazy, process-wide model handles (shared across sessions via st.cache_resource) ---
+@st.cache_resource(show_spinner=False)
+def get_sbert_model():
+    """Loads the configured sentence-embedding backend on first use."""
+    try:
+        if not embedding_backend.EMBEDDING_SERVER:
+            # Behind the embedding server the local stack is imported only if FallbackBackend falls back to it
+            _timed_import("onnxruntime" if embedding_backend.BACKEND == "onnx" else "sentence_transformers")
+        started = time.perf_counter()
+        model = embedding_backend.load_backend(SBERT_MODEL_NAME)
+        _record(f"load {EMBEDDING_MODEL_ID}", started)
+        return model
+    except Exception as e:
+        metrics.incr("errors_total", stage="model_load")
+        st.error(f"Error loading sentence model: {e}")
+        return None
+
+@st.cache_resource(show_spinner=False)
+def get_keybert_model():
+    """Loads KeyBERT on first use, embedding through the shared backend."""
+    sbert_model = get_sbert_model()
+    if sbert_model is None:
+        return None
+    try:
+        keybert = _timed_import("keybert")
+        started = time.perf_counter()
+        model = keybert.KeyBERT(model=embedding_backend.make_keybert_embedder(sbert_model))
+        _record("load KeyBERT", started)
+        return model
+    except Exception as e:
+        metrics.incr("errors_total", stage="model_load")
+        st.error(f"Error loading KeyBERT: {e}")
+        return None
+
+@st.cache_resource(show_spinner=False)
+def get_gemini_model():
+    """Configures the Gemini client from Streamlit secrets on first use."""
+    try:
+        genai = _timed_import("google.generativeai")
+        started = time.perf_counter()
+        genai.configure(api_key=st.secrets["GOOGLE_API_KEY"])
+        model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+        _record(f"load {GEMINI_MODEL_NAME}", started)
+        return model
+    except (KeyError, Exception):
+        return None
+
+# --- Warm-up and reporting ---
+def start_background_warmup():
+    """Starts loading the local models in a daemon thread (once per process)."""
+    global _warmup_thread
+    if _warmup_thread is None:
+        _warmup_thread = threading.Thread(target=get_keybert_model, name="model-warmup", daemon=True)
+        _warmup_thread.start()
+    return _warmup_thread
+
+def get_startup_report() -> dict:
+    """Returns the import and load cost per module/model recorded so far, in seconds."""
+    return dict(_STARTUP_TIMINGS)
+
+if __name__ == "__main__":
+    # Cold-start breakdown: python -m reviewer.models
+    get_keybert_model()
+    get_gemini_model()
+    for name, seconds in get_startup_report().items():
+        print(f"{name:<45} {seconds:8.3f}s")
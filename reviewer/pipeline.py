@@ -0,0 +1,54 @@
+# file: reviewer/pipeline.py
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from reviewer.ai_suggestions import cache_key, fetch_ai_suggestions, get_general_ai_feedback
+from reviewer.ats_scoring import calculate_ats_score
+from reviewer.models import get_gemini_model
+
+# Shared by all sessions; runs the Suggestions prefetch (an I/O-bound Gemini call).
+# Work whose result the script waits for runs on the script thread, where its
+# st.error messages can reach the user.
+PIPELINE_WORKERS = int(os.environ.get("RESUME_FORGE_PIPELINE_WORKERS", "8"))
+_EXECUTOR = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="analysis")
+
+def suggestions_key(resume_text: str, job_description: str, missing_skills: list):
+    """The RESPONSE_CACHE key suggestions for these inputs are stored under (None without Gemini)."""
+    gemini_model = get_gemini_model()
+    if gemini_model is None:
+        return None
+    return cache_key(gemini_model, "suggestions", resume_text, job_description, list(missing_skills))
+
+def _completed(fn, *args) -> Future:
+    """Runs fn on the calling (script) thread and wraps its outcome in a Future."""
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def start_analysis(resume_text: str, job_description: str, review_mode: bool):
+    """
+    Runs the ATS Review analysis and prefetches the Suggestions result in
+    the background. Returns (results_future, suggestions_key); the results
+    future is already resolved, and the prefetch stores the markdown review
+    in RESPONSE_CACHE under suggestions_key. If Gemini is unavailable or
+    failed nothing is stored, and the Suggestions tab falls back to streaming.
+
+    Without a JD the quality review and the suggestions are independent
+    Gemini calls: the prefetch starts first and runs concurrently with
+    the review. With a JD the suggestions prompt needs the missing skills,
+    so the prefetch starts right after scoring and runs while the user
+    reads the score.
+    """
+    # Only the cache key is handed back, so sessions never hold the review text
+    if not review_mode:
+        _EXECUTOR.submit(fetch_ai_suggestions, resume_text, job_description, [])
+        return _completed(get_general_ai_feedback, resume_text), suggestions_key(resume_text, job_description, [])
+
+    results = _completed(calculate_ats_score, resume_text, job_description)
+    missing_skills = [] if results.exception() else results.result().get('missing_skills', [])
+    _EXECUTOR.submit(fetch_ai_suggestions, resume_text, job_description, missing_skills)
+    return results, suggestions_key(resume_text, job_description, missing_skills)
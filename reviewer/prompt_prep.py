@@ -0,0 +1,192 @@
+# file: reviewer/prompt_prep.py
+"""
+Prompt compaction for the Gemini calls: Gemini latency and cost grow with
+input tokens, and raw PDF text and pasted JDs carry a lot of noise.
+
+    normalize      unicode/whitespace cleanup, blank-line collapsing
+    furniture      page numbers and running headers/footers (short lines at
+                   the top or bottom of more than one page)
+    boilerplate    EEO / legal / benefits sentences in job descriptions
+    budget         JD sentences ranked by similarity to the resume; both
+                   inputs trimmed to a token budget
+
+Token counts are estimated (CHARS_PER_TOKEN), not measured with a tokenizer.
+"""
+
+import logging
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+
+from common import metrics
+from reviewer.resume_parser import PAGE_BREAK
+from reviewer.skill_index import split_sentences
+
+logger = logging.getLogger(__name__)
+
+COMPACTION_ENABLED = os.environ.get("RESUME_FORGE_PROMPT_COMPACTION", "1") == "1"
+RESUME_TOKEN_BUDGET = int(os.environ.get("RESUME_FORGE_PROMPT_RESUME_TOKENS", "2000"))
+JD_TOKEN_BUDGET = int(os.environ.get("RESUME_FORGE_PROMPT_JD_TOKENS", "800"))
+
+# Rough average for English text with Gemini's tokenizer
+CHARS_PER_TOKEN = 4
+
+# Lines longer than this are content, not headers/footers, even if they repeat
+MAX_FURNITURE_LINE_CHARS = 80
+# Non-blank lines at the top and at the bottom of each page that can be headers/footers
+FURNITURE_EDGE_LINES = 2
+
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+_SPACES = re.compile(r"[ \t\f\v\u00a0\u2000-\u200b\u202f\u205f\u3000]+")
+_BOILERPLATE = re.compile(
+    r"equal (employment )?opportunity|without regard to|regardless of (race|age|gender)|"
+    r"reasonable accommodation|e-verify|affirmative action|protected (veteran|characteristic|class)|"
+    r"background check|privacy (notice|policy)|we do not discriminate|does not discriminate|"
+    r"applicants? (with|who require) (a )?disabilit|pay transparency",
+    re.IGNORECASE,
+)
+
+def settings_key() -> tuple:
+    """Settings that change the compacted text; part of the response cache key."""
+    return (COMPACTION_ENABLED, RESUME_TOKEN_BUDGET, JD_TOKEN_BUDGET)
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+def _normalize_page(text: str) -> str:
+    lines = [_SPACES.sub(" ", line).strip() for line in text.splitlines()]
+    compacted = []
+    for line in lines:
+        if line or (compacted and compacted[-1]):
+            compacted.append(line)
+    return "\n".join(compacted).strip()
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes unicode and whitespace, strips each line and collapses blank
+    runs, keeping the PAGE_BREAKs between pages.
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    return PAGE_BREAK.join(_normalize_page(page) for page in text.split(PAGE_BREAK)).strip(PAGE_BREAK)
+
+def _edge_lines(lines: list) -> set:
+    """Indexes of the first and last FURNITURE_EDGE_LINES non-blank lines of a page."""
+    content = [i for i, line in enumerate(lines) if line]
+    return set(content[:FURNITURE_EDGE_LINES] + content[-FURNITURE_EDGE_LINES:])
+
+def strip_page_furniture(text: str) -> str:
+    """
+    Drops page numbers and running headers/footers (e.g. the candidate's
+    name and contact line on every page) and joins the pages. Only the
+    first and last lines of each page are candidates: a short one is
+    furniture if it is also at the top or bottom of another page, and only
+    its first occurrence is kept. Body lines are never dropped.
+    """
+    pages = [page.splitlines() for page in text.split(PAGE_BREAK)]
+    edges = [_edge_lines(lines) for lines in pages]
+    # Number of pages each short edge line appears on
+    edge_counts = Counter()
+    for lines, edge in zip(pages, edges):
+        edge_counts.update({lines[i].lower() for i in edge if len(lines[i]) <= MAX_FURNITURE_LINE_CHARS})
+
+    seen = set()
+    kept = []
+    for lines, edge in zip(pages, edges):
+        for i, line in enumerate(lines):
+            if i in edge:
+                key = line.lower()
+                if _PAGE_NUMBER.match(line):
+                    continue
+                if edge_counts[key] > 1:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+            if line or (kept and kept[-1]):
+                kept.append(line)
+    return "\n".join(kept).strip()
+
+def strip_boilerplate(text: str) -> str:
+    """Drops EEO, legal and similar sentences that carry no signal about the role."""
+    kept = []
+    for line in text.splitlines():
+        sentences = re.split(r"(?<=[.!?])\s+", line)
+        line = " ".join(sentence for sentence in sentences if not _BOILERPLATE.search(sentence))
+        if line or (kept and kept[-1]):
+            kept.append(line)
+    return "\n".join(kept).strip()
+
+def trim_to_budget(text: str, max_tokens: int) -> str:
+    """Keeps whole leading lines up to the budget (resumes front-load what matters)."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    cut = text.rfind("\n", 0, max_chars)
+    return text[:cut if cut > 0 else max_chars].rstrip()
+
+def select_relevant_sentences(job_description: str, resume_text: str, max_tokens: int) -> str:
+    """
+    Keeps the JD sentences most similar to the resume that fit the budget,
+    in their original order. Uses the local sentence model (through the
+    embedding cache); without it, the leading sentences are kept.
+    """
+    if estimate_tokens(job_description) <= max_tokens:
+        return job_description
+    sentences = split_sentences(job_description)
+    order = list(range(len(sentences)))
+    try:
+        from reviewer.ats_scoring import cos_sim, embed_document, encode_texts
+        from reviewer.models import get_sbert_model
+        if get_sbert_model() is not None and resume_text:
+            similarities = cos_sim(encode_texts(sentences), embed_document(resume_text)[None, :])[:, 0]
+            order = sorted(order, key=lambda i: -similarities[i])
+    except Exception:
+        metrics.incr("errors_total", stage="prompt_rank")
+
+    chosen, used = set(), 0
+    for i in order:
+        cost = estimate_tokens(sentences[i]) + 1
+        if used + cost > max_tokens:
+            continue
+        chosen.add(i)
+        used += cost
+    return "\n".join(sentences[i] for i in sorted(chosen))
+
+def _report(kind: str, before: int, after: int):
+    metrics.incr("prompt_tokens_in_total", before, kind=kind)
+    metrics.incr("prompt_tokens_saved_total", before - after, kind=kind)
+
+def compact_resume(resume_text: str) -> str:
+    if not COMPACTION_ENABLED:
+        return resume_text
+    compacted = trim_to_budget(strip_page_furniture(normalize_text(resume_text)), RESUME_TOKEN_BUDGET)
+    _report("resume", estimate_tokens(resume_text), estimate_tokens(compacted))
+    return compacted
+
+def compact_job_description(job_description: str, resume_text: str = "") -> str:
+    if not COMPACTION_ENABLED:
+        return job_description
+    compacted = strip_boilerplate(strip_page_furniture(normalize_text(job_description)))
+    compacted = select_relevant_sentences(compacted, resume_text, JD_TOKEN_BUDGET)
+    _report("job_description", estimate_tokens(job_description), estimate_tokens(compacted))
+    return compacted
+
+def compact_inputs(resume_text: str, job_description: str = None) -> tuple:
+    """
+    Returns (resume_text, job_description, report) ready for a prompt; the
+    report has the estimated tokens before and after compaction.
+    """
+    resume = compact_resume(resume_text)
+    jd = compact_job_description(job_description, resume) if job_description else job_description
+    before = estimate_tokens(resume_text) + estimate_tokens(job_description)
+    after = estimate_tokens(resume) + estimate_tokens(jd)
+    return resume, jd, {"tokens_before": before, "tokens_after": after, "tokens_saved": before - after}
+
+def record_report(prompt: str, report: dict):
+    """Records one prompt's compaction report (a per-prompt counter and a log line)."""
+    metrics.incr("prompt_compactions_total", prompt=prompt)
+    logger.info(
+        "%s prompt: %d -> %d estimated tokens (%d saved)",
+        prompt, report["tokens_before"], report["tokens_after"], report["tokens_saved"],
+    )
\ No newline at end of file
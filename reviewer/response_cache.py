@@ -0,0 +1,159 @@
+# file: reviewer/response_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from common import metrics
+
+# Lifetime and size bounds for cached Gemini responses. Set
+# RESUME_FORGE_RESPONSE_CACHE_DB to a sqlite path to keep them across restarts.
+DEFAULT_TTL_SECONDS = float(os.environ.get("RESUME_FORGE_RESPONSE_CACHE_TTL", str(24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("RESUME_FORGE_RESPONSE_CACHE_SIZE", "256"))
+DEFAULT_MAX_BYTES = int(os.environ.get("RESUME_FORGE_RESPONSE_CACHE_BYTES", str(8 * 1024 * 1024)))
+DEFAULT_DB_PATH = os.environ.get("RESUME_FORGE_RESPONSE_CACHE_DB")
+
+# How long a caller waits for an identical in-flight request before giving up on it
+INFLIGHT_WAIT_SECONDS = 120
+
+def make_key(*parts) -> str:
+    """Hashes the JSON-serializable parts that fully determine a response."""
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """
+    TTL + size bounded cache for generated responses, with optional sqlite
+    persistence and coalescing of identical in-flight requests.
+    Values must be JSON-serializable.
+    """
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES, db_path: str = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, expires_at REAL, value TEXT)")
+            self._db.commit()
+
+    def _drop(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _store(self, key: str, value, expires_at: float, payload: str):
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (expires_at, len(payload), value)
+        self._bytes += len(payload)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._drop(next(iter(self._entries)))
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                self._drop(key)
+            if self._db is not None:
+                row = self._db.execute("SELECT expires_at, value FROM responses WHERE key = ?", (key,)).fetchone()
+                if row and row[0] > now:
+                    value = json.loads(row[1])
+                    self._store(key, value, row[0], row[1])
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value):
+        payload = json.dumps(value, ensure_ascii=False)
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._store(key, value, expires_at, payload)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO responses (key, expires_at, value) VALUES (?, ?, ?)", (key, expires_at, payload))
+                self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+                self._db.commit()
+
+    # --- In-flight coalescing ---
+    def begin(self, key: str):
+        """
+        Registers a request for key. Returns (True, future) if the caller
+        must produce the value and then call finish(); otherwise
+        (False, future) for a request already in flight.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return False, future
+            future = Future()
+            self._inflight[key] = future
+            return True, future
+
+    def finish(self, key: str, value=None, cache: bool = True):
+        """Resolves an in-flight request; value=None (or cache=False) wakes waiters without caching."""
+        if cache and value is not None:
+            self.put(key, value)
+        with self._lock:
+            future = self._inflight.pop(key, None)
+        if future is not None:
+            future.set_result(value if cache else None)
+
+    def get_or_compute(self, key: str, compute):
+        """
+        Returns the cached value for key, or computes it once even when
+        several callers ask at the same time. compute() returns
+        (value, cacheable); uncacheable values (e.g. errors) are returned
+        to the caller but never stored or shared.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        owner, future = self.begin(key)
+        if not owner:
+            try:
+                value = future.result(timeout=INFLIGHT_WAIT_SECONDS)
+            except Exception:
+                value = None
+            if value is not None:
+                return value
+            return compute()[0]
+
+        value, cacheable = None, False
+        try:
+            value, cacheable = compute()
+            return value
+        finally:
+            self.finish(key, value, cache=cacheable)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+            }
+
+# Process-wide instance, shared by every Streamlit session on this server
+RESPONSE_CACHE = ResponseCache(db_path=DEFAULT_DB_PATH)
+metrics.register_collector("response_cache", RESPONSE_CACHE.stats)
@@ -0,0 +1,199 @@
+# file: reviewer/resume_index.py
+"""
+Persistent resume embedding store with top-k retrieval for a job description.
+
+On disk an index directory holds:
+    index.json   - model name and embedding dimension
+    vectors.f16  - append-only float16 matrix, one normalized row per resume
+    meta.jsonl   - one metadata line per row (same order as vectors.f16)
+    ivf.npz      - optional inverted-file partitioning for approximate search
+
+    python -m reviewer.resume_index search INDEX_DIR --jd job.txt -k 20
+    python -m reviewer.resume_index build-ivf INDEX_DIR --lists 256
+
+The store assumes a single writer process; any number of readers can search.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(" ".join(text.split()).encode('utf-8')).hexdigest()
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=-1, keepdims=True), 1e-12)
+
+class ResumeIndex:
+    def __init__(self, index_dir: str, dim: int = None, model_name: str = None):
+        self.index_dir = index_dir
+        self._header_path = os.path.join(index_dir, "index.json")
+        self._vectors_path = os.path.join(index_dir, "vectors.f16")
+        self._meta_path = os.path.join(index_dir, "meta.jsonl")
+        self._ivf_path = os.path.join(index_dir, "ivf.npz")
+
+        if os.path.exists(self._header_path):
+            with open(self._header_path, encoding='utf-8') as f:
+                header = json.load(f)
+            if model_name and header["model"] != model_name:
+                raise ValueError(f"Index was built with {header['model']}, not {model_name}.")
+            self.dim, self.model_name = header["dim"], header["model"]
+        else:
+            if dim is None:
+                raise ValueError(f"No index at {index_dir}; pass dim to create one.")
+            os.makedirs(index_dir, exist_ok=True)
+            self.dim, self.model_name = dim, model_name
+            with open(self._header_path, 'w', encoding='utf-8') as f:
+                json.dump({"dim": dim, "model": model_name}, f)
+
+        self.metadata = []
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, encoding='utf-8') as f:
+                self.metadata = [json.loads(line) for line in f if line.strip()]
+        # Rows whose metadata line never made it to disk are ignored
+        self._row_by_hash = {meta["hash"]: row for row, meta in enumerate(self.metadata)}
+        self._ivf = dict(np.load(self._ivf_path)) if os.path.exists(self._ivf_path) else None
+
+    def __len__(self):
+        return len(self.metadata)
+
+    def __contains__(self, text_hash: str):
+        return text_hash in self._row_by_hash
+
+    def vectors(self) -> np.ndarray:
+        """Memory-maps the stored rows without loading them into RAM."""
+        if not self.metadata:
+            return np.empty((0, self.dim), dtype=np.float16)
+        return np.memmap(self._vectors_path, dtype=np.float16, mode='r', shape=(len(self.metadata), self.dim))
+
+    def get(self, text_hash: str):
+        """Returns (embedding, metadata) for a previously stored resume, or None."""
+        row = self._row_by_hash.get(text_hash)
+        if row is None:
+            return None
+        return np.asarray(self.vectors()[row], dtype=np.float32), self.metadata[row]
+
+    def add(self, embeddings: np.ndarray, metadata: list) -> int:
+        """
+        Appends resumes to the store. Each metadata dict must carry a "hash"
+        (see content_hash); rows whose hash is already stored are skipped.
+        Returns the number of rows added.
+        """
+        rows = [(vec, meta) for vec, meta in zip(_normalize(embeddings), metadata) if meta["hash"] not in self._row_by_hash]
+        if not rows:
+            return 0
+        # Vectors first, metadata second: a crash in between leaves orphan
+        # vector bytes that are overwritten by the next append
+        matrix = np.vstack([vec for vec, _ in rows]).astype(np.float16)
+        with open(self._vectors_path, 'r+b' if os.path.exists(self._vectors_path) else 'wb') as f:
+            f.seek(len(self.metadata) * self.dim * 2)
+            f.write(matrix.tobytes())
+            f.truncate()
+        with open(self._meta_path, 'a', encoding='utf-8') as f:
+            for _, meta in rows:
+                self._row_by_hash[meta["hash"]] = len(self.metadata)
+                self.metadata.append(meta)
+                f.write(json.dumps(meta) + "\n")
+        return len(rows)
+
+    def build_ivf(self, n_lists: int = 256, iterations: int = 10, seed: int = 0):
+        """
+        Partitions the stored rows with spherical k-means for approximate search.
+        Returns False (and builds nothing) for an empty index.
+        """
+        if not self.metadata:
+            return False
+        vectors = np.asarray(self.vectors(), dtype=np.float32)
+        n_lists = max(1, min(n_lists, len(vectors)))
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)]
+        for _ in range(iterations):
+            assignments = (vectors @ centroids.T).argmax(axis=1)
+            for i in range(n_lists):
+                members = vectors[assignments == i]
+                if len(members):
+                    centroids[i] = members.sum(axis=0)
+            centroids = _normalize(centroids)
+        assignments = (vectors @ centroids.T).argmax(axis=1)
+
+        self._ivf = {"centroids": centroids.astype(np.float32), "assignments": assignments.astype(np.int32)}
+        np.savez(self._ivf_path, **self._ivf)
+        return True
+
+    def _candidate_rows(self, query: np.ndarray, n_probe: int) -> np.ndarray:
+        centroids, assignments = self._ivf["centroids"], self._ivf["assignments"]
+        probe = np.argsort(-(centroids @ query))[:n_probe]
+        rows = np.flatnonzero(np.isin(assignments, probe))
+        # Rows appended after the partitioning was built are always scanned
+        tail = np.arange(len(assignments), len(self.metadata))
+        return np.concatenate([rows, tail])
+
+    def search(self, query_embedding: np.ndarray, k: int = 10, approximate: bool = False, n_probe: int = 8) -> list:
+        """
+        Returns the k best-matching resumes as (score, metadata) pairs.
+        Exact search scans every row; approximate search only scans the
+        n_probe closest IVF lists (call build_ivf first).
+        """
+        if not self.metadata or k <= 0:
+            return []
+        query = _normalize(query_embedding).reshape(-1)
+        vectors = self.vectors()
+
+        rows = self._candidate_rows(query, n_probe) if approximate and self._ivf is not None else None
+        if rows is not None and len(rows):
+            scores = np.asarray(vectors[rows], dtype=np.float32) @ query
+        else:
+            # Exact search, also the fallback when the probed lists hold no rows
+            rows = np.arange(len(self.metadata))
+            # Scan in blocks so the memory-mapped matrix is never fully materialized
+            scores = np.concatenate([
+                np.asarray(vectors[start:start + 65536], dtype=np.float32) @ query
+                for start in range(0, len(rows), 65536)
+            ])
+
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.metadata[rows[i]]) for i in top]
+
+def main(argv=None):
+    from reviewer.ats_scoring import embed_document
+    from reviewer.models import EMBEDDING_MODEL_ID
+
+    parser = argparse.ArgumentParser(description="Query or maintain a resume embedding index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search_cmd = commands.add_parser("search", help="Find the resumes that best match a job description.")
+    search_cmd.add_argument("index_dir")
+    search_cmd.add_argument("--jd", required=True, help="Job description text file.")
+    search_cmd.add_argument("-k", type=int, default=20)
+    search_cmd.add_argument("--approximate", action="store_true", help="Use the IVF partitioning instead of a full scan.")
+    search_cmd.add_argument("--n-probe", type=int, default=8)
+    ivf_cmd = commands.add_parser("build-ivf", help="Build the approximate-search partitioning.")
+    ivf_cmd.add_argument("index_dir")
+    ivf_cmd.add_argument("--lists", type=int, default=256)
+    args = parser.parse_args(argv)
+
+    # Queries are embedded with the active backend, which must be the one the index was built with
+    try:
+        index = ResumeIndex(args.index_dir, model_name=EMBEDDING_MODEL_ID if args.command == "search" else None)
+    except ValueError as e:
+        sys.exit(f"error: {e}")
+    if args.command == "build-ivf":
+        if not index.build_ivf(args.lists):
+            print("The index is empty; nothing to partition.")
+            return
+        print(f"Partitioned {len(index)} resumes into {min(args.lists, len(index))} lists.")
+        return
+
+    with open(args.jd, encoding='utf-8') as f:
+        query = embed_document(f.read())
+    for score, meta in index.search(query, args.k, args.approximate, args.n_probe):
+        print(f"{score:.3f}  {meta.get('resume', meta['hash'])}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,98 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
 from PyPDF2 import PdfReader
+from common import metrics
+
+# Guards against pathological uploads
+MAX_PDF_BYTES = int(os.environ.get("RESUME_FORGE_MAX_PDF_BYTES", str(10 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.environ.get("RESUME_FORGE_MAX_PDF_PAGES", "50"))
+
+# Documents with at least this many pages are extracted on a process pool
+PARALLEL_PAGE_THRESHOLD = int(os.environ.get("RESUME_FORGE_PARALLEL_PAGES", "8"))
+PDF_WORKERS = int(os.environ.get("RESUME_FORGE_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Separates page texts in extracted text (a form feed, which str.split() and
+# str.splitlines() treat as whitespace / a line break); prompt compaction
+# uses it to find running headers and footers per page
+PAGE_BREAK = "\f"
+
+# Extracted text keyed by sha256 of the file bytes
+TEXT_CACHE_SIZE = 128
+_text_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+class PDFTooLargeError(ValueError):
+    """Raised when an upload exceeds MAX_PDF_BYTES."""
+
+def _read_bytes(uploaded_file) -> bytes:
+    if isinstance(uploaded_file, (bytes, bytearray)):
+        data = bytes(uploaded_file)
+    elif isinstance(uploaded_file, (str, os.PathLike)):
+        with open(uploaded_file, 'rb') as f:
+            data = f.read(MAX_PDF_BYTES + 1)
+    else:
+        # Streamlit UploadedFile or any binary file object
+        uploaded_file.seek(0)
+        data = uploaded_file.read(MAX_PDF_BYTES + 1)
+    if len(data) > MAX_PDF_BYTES:
+        raise PDFTooLargeError(f"PDF is larger than the {MAX_PDF_BYTES // (1024 * 1024)} MB limit.")
+    return data
+
+def _extract_page_range(data: bytes, start: int, stop: int) -> list:
+    """Worker: extracts pages [start, stop) from the raw PDF bytes."""
+    reader = PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn, not fork: the Streamlit server process is multi-threaded
+            _executor = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+def iter_pdf_pages(uploaded_file):
+    """Yields the text of each page in order, up to MAX_PDF_PAGES pages."""
+    data = _read_bytes(uploaded_file)
+    reader = PdfReader(io.BytesIO(data))
+    for page in reader.pages[:MAX_PDF_PAGES]:
+        yield page.extract_text() or ""
+
+def extract_pages(data: bytes) -> list:
+    """Extracts page texts, fanning large documents out over a process pool."""
+    page_count = min(len(PdfReader(io.BytesIO(data)).pages), MAX_PDF_PAGES)
+    if page_count < PARALLEL_PAGE_THRESHOLD or PDF_WORKERS < 2:
+        return _extract_page_range(data, 0, page_count)
+
+    step = -(-page_count // PDF_WORKERS)
+    futures = [
+        _get_executor().submit(_extract_page_range, data, start, min(start + step, page_count))
+        for start in range(0, page_count, step)
+    ]
+    return [text for future in futures for text in future.result()]
 
 def extract_text_from_pdf(uploaded_file) -> str:
-    reader = PdfReader(uploaded_file)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""
-    return text.strip()
+    data = _read_bytes(uploaded_file)
+    key = hashlib.sha256(data).hexdigest()
+    with _cache_lock:
+        if key in _text_cache:
+            _text_cache.move_to_end(key)
+            metrics.incr("cache_hits_total", cache="pdf_text")
+            return _text_cache[key]
+
+    metrics.incr("cache_misses_total", cache="pdf_text")
+    with metrics.span("pdf_extract"):
+        text = PAGE_BREAK.join(extract_pages(data)).strip()
+    with _cache_lock:
+        _text_cache[key] = text
+        while len(_text_cache) > TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)
+    return text
@@ -0,0 +1,85 @@
+# file: reviewer/skill_index.py
+
+import hashlib
+import os
+import re
+
+import numpy as np
+import streamlit as st
+from reviewer.embedding_cache import EMBEDDING_CACHE
+from reviewer.models import get_sbert_model
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SKILLS_PATH = os.environ.get("RESUME_FORGE_SKILLS_PATH", os.path.join(_PROJECT_ROOT, 'assets', 'skills.txt'))
+INDEX_DIR = os.environ.get("RESUME_FORGE_SKILL_INDEX_DIR", os.path.join(_PROJECT_ROOT, 'assets', 'skill_index'))
+
+# A vocabulary phrase must reach this similarity with some JD sentence to be reported
+MIN_SKILL_SCORE = 0.45
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?;])\s+|[\n\f]+')
+
+def load_skill_vocabulary(path: str = SKILLS_PATH) -> list:
+    """Reads the skill phrases, skipping comments, blanks and duplicates."""
+    with open(path, encoding='utf-8') as f:
+        lines = (line.strip() for line in f)
+        return list(dict.fromkeys(line for line in lines if line and not line.startswith('#')))
+
+def split_sentences(text: str) -> list:
+    """Splits text into non-empty sentences / lines."""
+    return [part.strip() for part in _SENTENCE_SPLIT.split(text) if part and part.strip()]
+
+def _index_path(phrases: list, model_id: str) -> str:
+    digest = hashlib.sha256("\n".join([model_id] + phrases).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(INDEX_DIR, f"skills_{digest}.npy")
+
+def build_skill_index(phrases: list, model) -> np.ndarray:
+    """
+    Embeds the vocabulary once and stores it as a row-normalized float16
+    matrix on disk. The file name encodes the model and vocabulary, so a
+    changed vocabulary simply produces a new index.
+    """
+    path = _index_path(phrases, model.model_id)
+    if os.path.exists(path):
+        return np.load(path, mmap_mode='r')
+
+    embeddings = np.asarray(model.encode(phrases, convert_to_numpy=True, batch_size=256), dtype=np.float32)
+    embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    matrix = embeddings.astype(np.float16)
+
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    tmp_path = path + ".tmp.npy"
+    np.save(tmp_path, matrix)
+    os.replace(tmp_path, path)
+    return matrix
+
+@st.cache_resource(show_spinner=False)
+def get_skill_index():
+    """Returns (phrases, float16 matrix), building the index on first use."""
+    model = get_sbert_model()
+    if model is None:
+        return None
+    phrases = load_skill_vocabulary()
+    return phrases, build_skill_index(phrases, model)
+
+def extract_skills_from_index(job_description: str, top_n: int = 15) -> list:
+    """
+    Extracts JD skills by matching the JD's sentences against the
+    precomputed vocabulary: one batched encode plus one matrix multiply.
+    """
+    index = get_skill_index()
+    sentences = split_sentences(job_description)
+    if index is None or not sentences:
+        return []
+    phrases, matrix = index
+
+    model = get_sbert_model()
+    chunk_embeddings = EMBEDDING_CACHE.encode(model, model.model_id, sentences)
+    chunk_embeddings /= np.maximum(np.linalg.norm(chunk_embeddings, axis=1, keepdims=True), 1e-12)
+
+    # Best score of each vocabulary phrase over all JD sentences
+    scores = (chunk_embeddings @ matrix.T.astype(np.float32)).max(axis=0)
+
+    top_n = min(top_n, len(phrases))
+    top = np.argpartition(-scores, top_n - 1)[:top_n]
+    top = top[np.argsort(-scores[top])]
+    return [phrases[i] for i in top if scores[i] >= MIN_SKILL_SCORE]
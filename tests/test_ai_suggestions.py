@@ -0,0 +1,58 @@
+# file: tests/test_ai_suggestions.py
+"""
+stream_ai_suggestions against FakeGeminiModel: chunks arrive in order, the
+assembled reply fills the response cache, and failures are not cached.
+"""
+
+import pytest
+
+import reviewer.ai_suggestions as ai_suggestions
+from reviewer.fake_gemini import FakeGeminiModel
+from reviewer.response_cache import ResponseCache
+
+RESUME = "Jane Doe\nData engineer with Python and SQL experience."
+JOB_DESCRIPTION = "We are hiring a data engineer who knows Python, SQL and Airflow."
+MISSING = ["Airflow"]
+REPLY = "### **Overall Impression**\nSolid resume with clear impact.\n### **Suggestions**\n- Mention Airflow."
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache()
+    monkeypatch.setattr(ai_suggestions, "RESPONSE_CACHE", cache)
+    return cache
+
+def _key(model):
+    return ai_suggestions.cache_key(model, "suggestions", RESUME, JOB_DESCRIPTION, MISSING)
+
+def test_stream_yields_chunks_and_fills_cache(cache):
+    model = FakeGeminiModel(REPLY, chunk_size=10)
+    chunks = list(ai_suggestions.stream_ai_suggestions(RESUME, JOB_DESCRIPTION, MISSING, model=model))
+
+    assert len(chunks) == -(-len(REPLY) // 10)
+    assert "".join(chunks) == REPLY
+    assert cache.get(_key(model)) == REPLY
+
+def test_cached_reply_is_served_without_calling_the_model(cache):
+    model = FakeGeminiModel(REPLY)
+    list(ai_suggestions.stream_ai_suggestions(RESUME, JOB_DESCRIPTION, MISSING, model=model))
+    chunks = list(ai_suggestions.stream_ai_suggestions(RESUME, JOB_DESCRIPTION, MISSING, model=model))
+
+    assert chunks == [REPLY]
+    assert len(model.prompts) == 1
+
+def test_failed_stream_is_not_cached(cache):
+    model = FakeGeminiModel(REPLY, errors=[ConnectionError("network down")])
+    chunks = list(ai_suggestions.stream_ai_suggestions(RESUME, JOB_DESCRIPTION, MISSING, model=model))
+
+    assert "Error generating AI suggestions: network down" in "".join(chunks)
+    assert cache.get(_key(model)) is None
+    assert cache.stats()["inflight"] == 0
+
+def test_abandoned_stream_releases_waiters_without_caching(cache):
+    model = FakeGeminiModel(REPLY, chunk_size=10)
+    stream = ai_suggestions.stream_ai_suggestions(RESUME, JOB_DESCRIPTION, MISSING, model=model)
+    next(stream)
+    stream.close()
+
+    assert cache.get(_key(model)) is None
+    assert cache.stats()["inflight"] == 0
@@ -0,0 +1,71 @@
+# file: tests/test_font_cache.py
+"""
+The process-level font cache in builder.pdf_generator copies fpdf2 TTFFont
+internals; its output must stay byte-identical to plain add_font().
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+import builder.pdf_generator as pdf_generator
+
+# The cache is disabled (add_font() is used) on fpdf2 versions it was not written against
+pytestmark = pytest.mark.skipif(
+    not pdf_generator.FPDF_VERSION.startswith(pdf_generator._FONT_CACHE_FPDF_VERSION),
+    reason="the font cache is disabled on this fpdf2 version",
+)
+
+FIXED_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+SAMPLE_RESUME = {
+    'full_name': 'Alex Morgan',
+    'job_title': 'Senior Data Engineer',
+    'email': 'alex.morgan@example.com',
+    'phone': '+1 555 0100',
+    'linkedin': 'https://www.linkedin.com/in/alexmorgan',
+    'summary': 'Data engineer with eight years of experience building reliable batch and streaming pipelines, '
+               'mentoring engineers and partnering with analytics teams to ship trustworthy data products.',
+    'skills': 'Python, SQL, Apache Spark, Airflow, Kafka, AWS, Terraform, dbt, Data Modeling, Mentoring',
+    'work_experience': [
+        {'job_title': 'Senior Data Engineer', 'company': 'Northwind Analytics', 'duration': '2021 - Present',
+         'description': 'Designed a streaming ingestion platform processing 2B events per day\n'
+                        'Cut warehouse costs by 35% through partitioning and query tuning\n'
+                        'Mentored five engineers and led the on-call rotation'},
+        {'job_title': 'Data Engineer', 'company': 'Contoso Retail', 'duration': '2017 - 2021',
+         'description': 'Built Airflow pipelines feeding the company-wide reporting layer\n'
+                        'Migrated legacy ETL jobs from cron scripts to Spark on EMR'},
+    ],
+    'education': [
+        {'degree': 'B.Tech in Computer Science', 'institution': 'State Technical University', 'year': '2017', 'cgpa': '8.6'},
+    ],
+    'projects': [
+        {'project_name': 'Open-source data quality checks', 'live_link': '', 'github_link': 'https://github.com/example/dq',
+         'description': 'Declarative data quality assertions for dbt models\nUsed by 40+ teams'},
+    ],
+    'certifications': [
+        {'cert_name': 'AWS Certified Data Analytics', 'issuing_org': 'Amazon Web Services', 'date': '2022'},
+    ],
+}
+
+class _FixedDatePDF(pdf_generator.ResumePDF):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_creation_date(FIXED_DATE)
+
+def _render(monkeypatch, cache_enabled: bool, data: dict) -> bytes:
+    monkeypatch.setattr(pdf_generator, "FONT_CACHE_ENABLED", cache_enabled)
+    monkeypatch.setattr(pdf_generator, "ResumePDF", _FixedDatePDF)
+    return bytes(pdf_generator.generate_pdf(data))
+
+def test_cached_fonts_match_add_font(monkeypatch):
+    expected = _render(monkeypatch, False, SAMPLE_RESUME)
+    # Twice: the second document reuses the templates parsed by the first
+    assert _render(monkeypatch, True, SAMPLE_RESUME) == expected
+    assert _render(monkeypatch, True, SAMPLE_RESUME) == expected
+
+def test_cached_fonts_do_not_leak_glyphs_between_documents(monkeypatch):
+    other = dict(SAMPLE_RESUME, full_name="Ωmega Ünïcode Ŋame", summary="Ħ ŧ ŋ ĸ — differing glyph set")
+    _render(monkeypatch, True, other)
+    expected = _render(monkeypatch, False, SAMPLE_RESUME)
+    assert _render(monkeypatch, True, SAMPLE_RESUME) == expected
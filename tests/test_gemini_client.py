@@ -0,0 +1,67 @@
+# file: tests/test_gemini_client.py
+"""
+GeminiClient against FakeGeminiModel: retries on transient errors, the
+bounded JSON re-ask, and the per-call timeout.
+"""
+
+import asyncio
+
+import pytest
+
+import reviewer.gemini_client as gemini_client
+from reviewer.ai_suggestions import FeedbackFormatError
+from reviewer.fake_gemini import FakeGeminiModel
+from reviewer.response_cache import ResponseCache
+
+VALID_REPLY = '{"score": 80, "feedback": "Good"}'
+
+class ResourceExhausted(Exception):
+    """Same class name as google-api-core's 429 error, which is retryable."""
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(gemini_client, "RESPONSE_CACHE", ResponseCache())
+    monkeypatch.setattr(gemini_client, "BACKOFF_BASE_SECONDS", 0.0)
+
+def _run(model, resume_texts, **client_kwargs):
+    return gemini_client.run_feedback_batch(resume_texts, model=model, requests_per_minute=0, **client_kwargs)
+
+def test_retryable_errors_are_retried():
+    model = FakeGeminiModel(text=VALID_REPLY, errors=[ResourceExhausted("quota"), TimeoutError()])
+    assert _run(model, ["resume"]) == [{"score": 80, "feedback": "Good"}]
+    assert len(model.prompts) == 3
+
+def test_non_retryable_error_fails_without_retry():
+    model = FakeGeminiModel(text=VALID_REPLY, errors=[ValueError("bad request")])
+    [result] = _run(model, ["resume"])
+    assert isinstance(result, ValueError)
+    assert len(model.prompts) == 1
+
+def test_invalid_json_is_reasked_once():
+    model = FakeGeminiModel(replies=["not json", VALID_REPLY])
+    assert _run(model, ["resume"]) == [{"score": 80, "feedback": "Good"}]
+    assert "could not be used" in model.prompts[1]
+
+def test_invalid_json_after_reask_raises_format_error():
+    model = FakeGeminiModel(replies=["not json", '{"score": 250, "feedback": "x"}'])
+    [result] = _run(model, ["resume"])
+    assert isinstance(result, FeedbackFormatError)
+    assert len(model.prompts) == gemini_client.MAX_JSON_REASKS + 1
+
+def test_slow_calls_time_out_and_are_retried():
+    class SlowOnce(FakeGeminiModel):
+        async def generate_content_async(self, prompt):
+            if not self.prompts:
+                self.prompts.append(prompt)
+                await asyncio.sleep(1)
+            return await super().generate_content_async(prompt)
+
+    model = SlowOnce(text=VALID_REPLY)
+    assert _run(model, ["resume"], timeout=0.05) == [{"score": 80, "feedback": "Good"}]
+    assert len(model.prompts) == 2
+
+def test_timeouts_fail_after_the_last_retry():
+    model = FakeGeminiModel(text=VALID_REPLY, first_chunk_delay=1)
+    [result] = _run(model, ["resume"], timeout=0.05, max_retries=1)
+    assert isinstance(result, (TimeoutError, asyncio.TimeoutError))
+    assert len(model.prompts) == 2
@@ -0,0 +1,74 @@
+# file: tests/test_response_cache.py
+"""
+ResponseCache: TTL expiry, size-bounded eviction and coalescing of
+identical in-flight requests.
+"""
+
+import threading
+import time
+
+import reviewer.response_cache as response_cache
+from reviewer.response_cache import ResponseCache
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    cache = ResponseCache(ttl_seconds=60)
+    cache.put("key", "value")
+
+    now[0] += 59
+    assert cache.get("key") == "value"
+    now[0] += 2
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+def test_byte_budget_evicts_oldest_entries():
+    cache = ResponseCache(max_bytes=15)
+    cache.put("a", "x" * 8)
+    cache.put("b", "y" * 8)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 8
+
+def test_concurrent_identical_requests_compute_once():
+    cache = ResponseCache()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return "reply", True
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    # Let every thread reach the cache before the first compute finishes
+    while cache.stats()["coalesced"] < 3:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["reply"] * 4
+    assert len(calls) == 1
+    assert cache.get("key") == "reply"
+
+def test_uncacheable_results_are_not_stored():
+    cache = ResponseCache()
+    assert cache.get_or_compute("key", lambda: ("error", False)) == "error"
+    assert cache.get("key") is None
+    assert cache.get_or_compute("key", lambda: ("reply", True)) == "reply"
+    assert cache.get("key") == "reply"